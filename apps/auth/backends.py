@@ -0,0 +1,35 @@
+from django.contrib.auth.backends import ModelBackend
+from .models import CustomUser
+
+
+# Champs jamais lus sur le chemin d'une requête (décorateurs, mixins, gabarit
+# de base, formulaires de profil) : ils sont chargés à la demande.
+# Ne pas y ajouter de champ lu par les vues, chaque accès coûterait une requête.
+REQUEST_USER_DEFERRED_FIELDS = ('avatar',)
+
+
+class CustomUserBackend(ModelBackend):
+    """
+    Backend d'authentification chargeant request.user sans ses champs froids.
+
+    AuthenticationMiddleware appelle get_user() à chaque requête authentifiée :
+    différer les colonnes inutiles réduit le volume lu dans la table des
+    utilisateurs. Le profil est joint dans la même requête (sans coût
+    supplémentaire) plutôt que chargé à part par les vues qui l'utilisent.
+    Les groupes ne sont pas préchargés : get_group_names() les charge à la
+    demande, une seule fois. request.user restant un SimpleLazyObject, les
+    requêtes anonymes ou qui n'utilisent pas l'utilisateur ne paient rien.
+    L'authentification (email/mot de passe) reste celle de ModelBackend.
+    """
+
+    def get_user(self, user_id):
+        try:
+            user = (
+                CustomUser._default_manager
+                .select_related('profile')
+                .defer(*REQUEST_USER_DEFERRED_FIELDS)
+                .get(pk=user_id)
+            )
+        except CustomUser.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
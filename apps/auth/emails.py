@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+Envoi des emails de l'application d'authentification.
+
+Les emails sont envoyés hors du cycle de la requête HTTP : la connexion SMTP
+(souvent plusieurs centaines de millisecondes) ne retarde plus la réponse.
+"""
+
+import logging
+import threading
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import transaction
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+
+def _send_mail_safely(subject, message, recipient):
+    """Envoie l'email et journalise l'échec (aucune vue n'est là pour l'afficher)."""
+    try:
+        send_mail(
+            subject,
+            message,
+            settings.DEFAULT_FROM_EMAIL,
+            [recipient],
+            fail_silently=False,
+        )
+    except Exception:
+        logger.exception("Échec de l'envoi de l'email '%s' à %s", subject, recipient)
+
+
+def send_mail_in_background(subject, message, recipient):
+    """
+    Envoie un email dans un thread séparé, après validation de la transaction.
+
+    L'envoi n'a lieu qu'une fois la transaction courante validée : un lien
+    envoyé pointe toujours vers des données enregistrées.
+
+    Args:
+        subject (str): Sujet de l'email
+        message (str): Corps de l'email (texte brut)
+        recipient (str): Adresse du destinataire
+    """
+    def start():
+        threading.Thread(
+            target=_send_mail_safely,
+            args=(subject, message, recipient),
+            daemon=True,
+        ).start()
+
+    transaction.on_commit(start)
@@ -5,6 +5,8 @@ from django import forms
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
 # authenticate : Fonction Django pour vérifier les identifiants
 from django.contrib.auth import authenticate
+# Lower : Fonction SQL lower(), la même expression que l'index ci_email_idx
+from django.db.models.functions import Lower
 # Nos modèles personnalisés
 from .models import CustomUser, UserProfile
 
@@ -93,7 +95,12 @@ class CustomUserCreationForm(UserCreationForm):
             ValidationError: Si l'email existe déjà
         """
         email = self.cleaned_data.get('email')
-        if CustomUser.objects.filter(email=email).exists():
+        # Comparaison sur lower(email) : l'expression de l'index ci_email_idx
+        # (iexact génère UPPER() ou LIKE selon la base et ne l'utilise pas)
+        email_exists = CustomUser.objects.alias(
+            email_lower=Lower('email')
+        ).filter(email_lower=email.lower()).exists()
+        if email_exists:
             raise forms.ValidationError('Un utilisateur avec cette adresse email existe déjà.')
         return email
     
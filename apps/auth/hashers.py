@@ -0,0 +1,17 @@
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Hacheur Argon2id aux paramètres ajustés pour la connexion.
+    
+    check_password() est exécuté à chaque connexion : avec PBKDF2 (600 000
+    itérations) il domine la latence de la vue de login. Argon2id résiste
+    mieux aux attaques par GPU grâce à sa mémoire, ce qui permet un coût en
+    temps plus faible. Les hashs existants (PBKDF2) sont convertis
+    automatiquement à la prochaine connexion réussie ; un changement de
+    paramètres ci-dessous déclenche de même le recalcul du hash.
+    """
+    time_cost = 2
+    memory_cost = 65536  # En KiB, soit 64 Mo
+    parallelism = 2
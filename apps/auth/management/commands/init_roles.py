@@ -10,9 +10,37 @@
 from django.core.management.base import BaseCommand  # Classe de base pour les commandes Django
 from django.contrib.auth.models import Group, Permission  # Modèles pour groupes et permissions
 from django.contrib.contenttypes.models import ContentType  # Pour les permissions personnalisées
+from django.db import transaction  # Pour regrouper toutes les écritures en une transaction
+from django.db.models import Count, Prefetch  # Agrégations et préchargements
 
 # Import du modèle utilisateur personnalisé
-from apps.auth.models import CustomUser
+from apps.auth.models import CustomUser, UserProfile
+# Modèles d'abonnement concernés par les permissions client
+from apps.subscription.models import Plan, Subscription
+
+
+# ========================================
+# PERMISSIONS DU GROUPE CLIENT
+# ========================================
+# Définies au niveau du module pour être réutilisables (autres commandes, tests)
+CLIENT_PERMISSION_CODENAMES = frozenset({
+    # ---- PERMISSIONS DE PROFIL UTILISATEUR ----
+    # Ces permissions permettent aux clients de gérer leur propre compte
+    'view_customuser',    # Voir son propre profil utilisateur
+    'change_customuser',  # Modifier ses informations personnelles
+    'view_userprofile',   # Consulter son profil étendu
+    'change_userprofile', # Modifier son profil étendu (bio, avatar, etc.)
+    
+    # ---- PERMISSIONS D'ABONNEMENT ----
+    # Ces permissions gèrent l'interaction avec le système d'abonnement
+    'view_subscription',   # Consulter les détails de son abonnement
+    'add_subscription',    # Créer un nouvel abonnement (s'abonner)
+    'change_subscription', # Modifier son abonnement (upgrade/downgrade)
+    
+    # ---- PERMISSIONS DE CONSULTATION DES PLANS ----
+    # Permission en lecture seule pour voir les offres disponibles
+    'view_plan',  # Consulter les plans d'abonnement disponibles
+})
 
 
 class Command(BaseCommand):
@@ -44,10 +72,14 @@ class Command(BaseCommand):
             help='Supprime et recrée tous les groupes existants',
         )
     
+    @transaction.atomic
     def handle(self, *args, **options):
         """
         Méthode principale qui exécute la logique de la commande.
         
+        Toute la commande s'exécute dans une seule transaction : une erreur
+        (y compris après la suppression de --reset) annule toutes les écritures.
+        
         Cette méthode :
         1. Gère l'option --reset pour supprimer les groupes existants
         2. Crée les groupes 'admin' et 'client'
@@ -60,13 +92,16 @@ class Command(BaseCommand):
             **options: Options de ligne de commande (contient 'reset')
         """
         
+        # Les messages sont accumulés puis écrits en une seule fois à la fin
+        lines = []
+        
         # ========================================
         # ÉTAPE 1: GESTION DE L'OPTION --reset
         # ========================================
         # Si l'option --reset est présente, supprime les groupes existants
         # pour permettre une réinitialisation complète
         if options['reset']:
-            self.stdout.write(
+            lines.append(
                 self.style.WARNING('Suppression des groupes existants...')
             )
             # Supprime uniquement les groupes de notre système
@@ -75,43 +110,54 @@ class Command(BaseCommand):
         # ========================================
         # ÉTAPE 2: CRÉATION DES GROUPES
         # ========================================
-        # get_or_create() retourne un tuple (objet, created)
-        # - objet: l'instance du groupe (existante ou nouvellement créée)
-        # - created: booléen indiquant si l'objet a été créé (True) ou existait déjà (False)
+        # Une seule requête récupère les deux groupes, puis un seul INSERT
+        # crée ceux qui manquent (au lieu de deux get_or_create successifs)
+        role_names = ('admin', 'client')
+        groups = {g.name: g for g in Group.objects.filter(name__in=role_names)}
+        missing = [name for name in role_names if name not in groups]
+        
+        if missing:
+            Group.objects.bulk_create(
+                [Group(name=name) for name in missing],
+                ignore_conflicts=True
+            )
+            # Rechargement pour obtenir les clés primaires des groupes créés
+            groups = {g.name: g for g in Group.objects.filter(name__in=role_names)}
         
-        admin_group, admin_created = Group.objects.get_or_create(name='admin')
-        client_group, client_created = Group.objects.get_or_create(name='client')
+        admin_group, admin_created = groups['admin'], 'admin' in missing
+        client_group, client_created = groups['client'], 'client' in missing
         
         # Affichage des messages de confirmation pour le groupe admin
         if admin_created:
-            self.stdout.write(
+            lines.append(
                 self.style.SUCCESS('Groupe "admin" créé avec succès')
             )
         else:
-            self.stdout.write('Groupe "admin" existe déjà')
+            lines.append('Groupe "admin" existe déjà')
         
         # Affichage des messages de confirmation pour le groupe client
         if client_created:
-            self.stdout.write(
+            lines.append(
                 self.style.SUCCESS('Groupe "client" créé avec succès')
             )
         else:
-            self.stdout.write('Groupe "client" existe déjà')
+            lines.append('Groupe "client" existe déjà')
         
         # ========================================
         # ÉTAPE 3: CONFIGURATION DES PERMISSIONS ADMIN
         # ========================================
         # Les administrateurs ont TOUTES les permissions du système
-        # Permission.objects.all() récupère toutes les permissions Django
-        # (modèles, vues, actions CRUD, etc.)
-        admin_permissions = Permission.objects.all()
+        # On ne récupère que les clés primaires de toutes les permissions Django
+        # (modèles, vues, actions CRUD, etc.) : .set() n'a besoin que des IDs
+        # Matérialisée une seule fois : évite un SELECT COUNT(*) supplémentaire
+        admin_permission_ids = list(Permission.objects.values_list('pk', flat=True))
         
         # .set() remplace toutes les permissions existantes du groupe
         # par la nouvelle liste (équivalent à clear() puis add())
-        admin_group.permissions.set(admin_permissions)
+        admin_group.permissions.set(admin_permission_ids)
         
-        self.stdout.write(
-            f'Toutes les permissions ({admin_permissions.count()}) '
+        lines.append(
+            f'Toutes les permissions ({len(admin_permission_ids)}) '
             'assignées au groupe "admin"'
         )
         
@@ -120,36 +166,25 @@ class Command(BaseCommand):
         # ========================================
         # Les clients ont des permissions limitées et spécifiques
         # Utilisation de filter() avec codename__in pour sélectionner
-        # uniquement les permissions nécessaires aux clients
-        
-        client_permissions = Permission.objects.filter(
-            codename__in=[
-                # ---- PERMISSIONS DE PROFIL UTILISATEUR ----
-                # Ces permissions permettent aux clients de gérer leur propre compte
-                'view_customuser',    # Voir son propre profil utilisateur
-                'change_customuser',  # Modifier ses informations personnelles
-                'view_userprofile',   # Consulter son profil étendu
-                'change_userprofile', # Modifier son profil étendu (bio, avatar, etc.)
-                
-                # ---- PERMISSIONS D'ABONNEMENT ----
-                # Ces permissions gèrent l'interaction avec le système d'abonnement
-                'view_subscription',   # Consulter les détails de son abonnement
-                'add_subscription',    # Créer un nouvel abonnement (s'abonner)
-                'change_subscription', # Modifier son abonnement (upgrade/downgrade)
-                
-                # ---- PERMISSIONS DE CONSULTATION DES PLANS ----
-                # Permission en lecture seule pour voir les offres disponibles
-                'view_plan',  # Consulter les plans d'abonnement disponibles
-            ]
+        # uniquement les permissions nécessaires aux clients, restreint aux
+        # content types concernés (index unique (content_type, codename) et
+        # aucune collision avec un codename identique d'une autre application)
+        client_content_types = ContentType.objects.get_for_models(
+            CustomUser, UserProfile, Subscription, Plan
         )
         
+        client_permission_ids = list(Permission.objects.filter(
+            content_type__in=client_content_types.values(),
+            codename__in=CLIENT_PERMISSION_CODENAMES,
+        ).values_list('pk', flat=True))
+        
         # Application des permissions sélectionnées au groupe client
         # .set() remplace toutes les permissions existantes
-        client_group.permissions.set(client_permissions)
+        client_group.permissions.set(client_permission_ids)
         
         # Affichage du nombre de permissions assignées
-        self.stdout.write(
-            f'{client_permissions.count()} permissions '
+        lines.append(
+            f'{len(client_permission_ids)} permissions '
             'assignées au groupe "client"'
         )
         
@@ -160,7 +195,7 @@ class Command(BaseCommand):
         # Si aucun n'existe, en crée un pour permettre l'accès initial à l'admin
         
         if not CustomUser.objects.filter(is_superuser=True).exists():
-            self.stdout.write(
+            lines.append(
                 self.style.WARNING(
                     'Aucun superutilisateur trouvé. '
                     'Création d\'un compte administrateur par défaut...'
@@ -181,10 +216,11 @@ class Command(BaseCommand):
             
             # Ajout du superutilisateur au groupe admin
             # Cela lui donne accès aux permissions définies pour ce groupe
-            admin_user.groups.add(admin_group)
+            # (la clé primaire suffit à insérer la ligne de la table M2M)
+            admin_user.groups.add(admin_group.pk)
             
             # Affichage des informations de connexion avec avertissement sécurité
-            self.stdout.write(
+            lines.append(
                 self.style.SUCCESS(
                     'Superutilisateur créé:\n'
                     'Email: admin@saas.com\n'
@@ -197,27 +233,29 @@ class Command(BaseCommand):
         # ÉTAPE 6: CRÉATION D'UN UTILISATEUR CLIENT DE TEST
         # ========================================
         # Crée un utilisateur client pour tester les fonctionnalités
-        # Vérifie d'abord si cet utilisateur n'existe pas déjà
+        # get_or_create() s'appuie sur l'unicité de l'email : une seule requête
+        # lorsque l'utilisateur existe déjà (cas courant)
         
-        if not CustomUser.objects.filter(email='client@test.com').exists():
-            # create_user() est la méthode standard qui :
-            # - Hash le mot de passe
-            # - Définit is_staff=False et is_superuser=False
-            # - Valide les champs requis
-            client_user = CustomUser.objects.create_user(
-                email='client@test.com',     # Email de connexion unique
-                password='client123',        # Mot de passe de test
-                first_name='Client',         # Prénom
-                last_name='Test',            # Nom de famille
-                user_type='client'           # Type d'utilisateur (client standard)
-            )
+        client_user, client_user_created = CustomUser.objects.get_or_create(
+            email='client@test.com',         # Email de connexion unique
+            defaults={
+                'first_name': 'Client',      # Prénom
+                'last_name': 'Test',         # Nom de famille
+                'user_type': 'client',       # Type d'utilisateur (client standard)
+            }
+        )
+        
+        if client_user_created:
+            # Hash du mot de passe de test (get_or_create ne passe pas par create_user)
+            client_user.set_password('client123')
+            client_user.save(update_fields=['password'])
             
             # Ajout de l'utilisateur au groupe client
             # Cela lui donne les permissions limitées définies pour les clients
-            client_user.groups.add(client_group)
+            client_user.groups.add(client_group.pk)
             
             # Confirmation de création avec informations de connexion
-            self.stdout.write(
+            lines.append(
                 self.style.SUCCESS(
                     'Utilisateur client de test créé:\n'
                     'Email: client@test.com\n'
@@ -232,19 +270,20 @@ class Command(BaseCommand):
         # avec des statistiques sur les groupes, permissions et utilisateurs
         
         # En-tête du résumé avec séparateur visuel
-        self.stdout.write('\n' + '='*50)
-        self.stdout.write(self.style.SUCCESS('RÉSUMÉ DE L\'INITIALISATION'))
-        self.stdout.write('='*50)
+        lines.append('\n' + '='*50)
+        lines.append(self.style.SUCCESS('RÉSUMÉ DE L\'INITIALISATION'))
+        lines.append('='*50)
         
         # Statistiques générales du système
         # Compte le nombre total d'objets créés/existants
-        self.stdout.write(f'Groupes créés: {Group.objects.count()}')
-        self.stdout.write(f'Permissions totales: {Permission.objects.count()}')
-        self.stdout.write(f'Utilisateurs admin: {CustomUser.objects.filter(user_type="admin").count()}')
-        self.stdout.write(f'Utilisateurs client: {CustomUser.objects.filter(user_type="client").count()}')
+        stats = self.get_stats()
+        lines.append(f'Groupes créés: {stats["groups"]}')
+        lines.append(f'Permissions totales: {stats["permissions"]}')
+        lines.append(f'Utilisateurs admin: {stats["admins"]}')
+        lines.append(f'Utilisateurs client: {stats["clients"]}')
         
         # Message de confirmation finale
-        self.stdout.write('\nGroupes et permissions configurés avec succès!')
+        lines.append('\nGroupes et permissions configurés avec succès!')
         
         # ========================================
         # ÉTAPE 8: DÉTAIL DES PERMISSIONS PAR GROUPE
@@ -252,25 +291,58 @@ class Command(BaseCommand):
         # Affiche un aperçu des permissions assignées à chaque groupe
         # Utile pour vérifier la configuration
         
-        self.stdout.write('\n' + '-'*30)
-        self.stdout.write('PERMISSIONS PAR GROUPE:')
-        self.stdout.write('-'*30)
+        lines.append('\n' + '-'*30)
+        lines.append('PERMISSIONS PAR GROUPE:')
+        lines.append('-'*30)
         
         # Parcourt tous les groupes existants
-        for group in Group.objects.all():
-            self.stdout.write(f'\n{group.name.upper()}:')
-            permissions = group.permissions.all()
+        # Le nombre de permissions est calculé par un COUNT annoté, et seules les
+        # 10 premières permissions de chaque groupe sont préchargées (LIMIT côté SQL)
+        groups = Group.objects.annotate(
+            permission_count=Count('permissions')
+        ).prefetch_related(
+            Prefetch(
+                'permissions',
+                queryset=Permission.objects.only('codename').order_by('codename')[:10],
+                to_attr='preview_permissions',
+            )
+        )
+        for group in groups:
+            lines.append(f'\n{group.name.upper()}:')
             
-            if permissions:
+            if group.permission_count:
                 # Affiche les 10 premières permissions pour éviter un output trop long
-                for perm in permissions[:10]:
-                    self.stdout.write(f'  - {perm.codename}')
+                for perm in group.preview_permissions:
+                    lines.append(f'  - {perm.codename}')
                 
                 # Indique s'il y a plus de permissions non affichées
-                if permissions.count() > 10:
-                    self.stdout.write(f'  ... et {permissions.count() - 10} autres')
+                if group.permission_count > 10:
+                    lines.append(f'  ... et {group.permission_count - 10} autres')
             else:
-                self.stdout.write('  Aucune permission')
+                lines.append('  Aucune permission')
+        
+        self.stdout.write('\n'.join(lines))
+    
+    def get_stats(self):
+        """
+        Calcule les statistiques affichées dans le résumé de la commande.
+        
+        Returns:
+            dict: Nombre de groupes, de permissions, d'admins et de clients
+        """
+        # Un seul GROUP BY user_type au lieu d'un COUNT(*) par type
+        user_counts = dict(
+            CustomUser.objects.order_by()
+            .values_list('user_type')
+            .annotate(n=Count('*'))
+            .values_list('user_type', 'n')
+        )
+        return {
+            'groups': Group.objects.count(),
+            'permissions': Permission.objects.count(),
+            'admins': user_counts.get('admin', 0),
+            'clients': user_counts.get('client', 0),
+        }
     
     def create_custom_permissions(self):
         """
@@ -298,18 +370,24 @@ class Command(BaseCommand):
             ('can_manage_subscriptions', 'Peut gérer les abonnements'),    # Administration des abonnements
         ]
         
-        # Création de chaque permission personnalisée
-        for codename, name in custom_permissions:
-            # get_or_create() évite les doublons
-            # Retourne (permission, created) où created indique si l'objet a été créé
-            permission, created = Permission.objects.get_or_create(
-                codename=codename,        # Nom technique de la permission
-                name=name,               # Description lisible
-                content_type=content_type, # Modèle associé
+        # Une seule requête pour récupérer les codenames déjà présents
+        existing_codenames = set(
+            Permission.objects.filter(
+                content_type=content_type,
+                codename__in=[codename for codename, _ in custom_permissions],
+            ).values_list('codename', flat=True)
+        )
+        
+        # Seules les permissions absentes sont créées, en un seul INSERT
+        to_create = [
+            Permission(codename=codename, name=name, content_type=content_type)
+            for codename, name in custom_permissions
+            if codename not in existing_codenames
+        ]
+        Permission.objects.bulk_create(to_create, ignore_conflicts=True)
+        
+        # Affichage uniquement pour les permissions nouvellement créées
+        for permission in to_create:
+            self.stdout.write(
+                self.style.SUCCESS(f'Permission personnalisée créée: {permission.name}')
             )
-            
-            # Affichage uniquement si la permission a été nouvellement créée
-            if created:
-                self.stdout.write(
-                    self.style.SUCCESS(f'Permission personnalisée créée: {name}')
-                )
\ No newline at end of file
@@ -0,0 +1,18 @@
+# Generated manually
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('custom_auth', '0003_passwordresettoken'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(django.db.models.functions.text.Lower('email'), name='ci_email_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated manually
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def hash_existing_tokens(apps, schema_editor):
+    """Remplace chaque token en clair par son empreinte SHA-256."""
+    PasswordResetToken = apps.get_model('custom_auth', 'PasswordResetToken')
+    for reset_token in PasswordResetToken.objects.only('pk', 'token').iterator():
+        reset_token.token_hash = hashlib.sha256(reset_token.token.encode()).digest()
+        reset_token.save(update_fields=['token_hash'])
+
+
+def delete_tokens(apps, schema_editor):
+    """Les tokens en clair ne peuvent pas être reconstruits : ils sont supprimés."""
+    PasswordResetToken = apps.get_model('custom_auth', 'PasswordResetToken')
+    PasswordResetToken.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('custom_auth', '0006_customuser_indexes_passwordresettoken_expires_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='passwordresettoken',
+            name='token_hash',
+            field=models.BinaryField(max_length=32, null=True, verbose_name='Empreinte du token'),
+        ),
+        migrations.RunPython(hash_existing_tokens, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='passwordresettoken',
+            name='token',
+        ),
+        migrations.RunPython(migrations.RunPython.noop, delete_tokens),
+        migrations.AlterField(
+            model_name='passwordresettoken',
+            name='token_hash',
+            field=models.BinaryField(help_text='Empreinte SHA-256 du token de réinitialisation', max_length=32, unique=True, verbose_name='Empreinte du token'),
+        ),
+    ]
@@ -1,6 +1,11 @@
+import hashlib
+from functools import cached_property
+
 # Imports Django pour la gestion des utilisateurs personnalisés
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
 from django.utils import timezone
 # Imports pour les signaux Django (création automatique de profil)
 from django.db.models.signals import post_save
@@ -152,6 +157,20 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
         verbose_name_plural = 'Utilisateurs'
         # Nom de table personnalisé pour éviter les conflits
         db_table = 'auth_user'
+        indexes = [
+            # Index fonctionnel pour les recherches d'email insensibles à la casse
+            models.Index(Lower('email'), name='ci_email_idx'),
+            # Filtres fréquents sur le type d'utilisateur (statistiques, init_roles)
+            models.Index(fields=['user_type'], name='cu_user_type_idx'),
+            # Inscriptions récentes (graphiques du dashboard, liste des utilisateurs)
+            models.Index(fields=['date_joined'], name='cu_date_joined_idx'),
+            # Index partiel : seuls les superutilisateurs sont indexés
+            models.Index(
+                fields=['is_superuser'],
+                condition=Q(is_superuser=True),
+                name='cu_superuser_partial',
+            ),
+        ]
     
     def __str__(self):
         """Représentation string de l'utilisateur (utilisée dans l'admin Django)."""
@@ -177,7 +196,9 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
         return self.first_name if self.first_name else self.email
     
     # === MÉTHODES UTILITAIRES ===
-    @property
+    # cached_property : la valeur est calculée une fois par instance, donc une
+    # fois par requête HTTP pour request.user
+    @cached_property
     def is_admin(self):
         """
         Vérifie si l'utilisateur est un administrateur.
@@ -187,7 +208,7 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
         """
         return self.user_type == 'admin' or self.is_superuser
     
-    @property
+    @cached_property
     def is_client(self):
         """
         Vérifie si l'utilisateur est un client.
@@ -197,6 +218,54 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
         """
         return self.user_type == 'client'
     
+    def set_user_type(self, user_type):
+        """
+        Change le type d'utilisateur et invalide les rôles mis en cache.
+        
+        is_admin et is_client étant des cached_property, une simple
+        affectation de user_type les laisserait à leur ancienne valeur.
+        
+        Args:
+            user_type (str): Nouveau type ('admin' ou 'client')
+        """
+        self.user_type = user_type
+        self.__dict__.pop('is_admin', None)
+        self.__dict__.pop('is_client', None)
+    
+    def get_group_name_list(self):
+        """
+        Retourne les noms des groupes de l'utilisateur, dans l'ordre de la base.
+        
+        Le résultat est mis en cache sur l'instance (comme le cache de
+        permissions de Django) : une seule requête par cycle de requête HTTP.
+        Si les groupes ont été préchargés avec prefetch_related('groups')
+        (vues de liste), aucune requête n'est exécutée.
+        
+        Returns:
+            list: Noms des groupes de l'utilisateur
+        """
+        if not hasattr(self, '_group_name_list_cache'):
+            prefetched = getattr(self, '_prefetched_objects_cache', {})
+            if 'groups' in prefetched:
+                self._group_name_list_cache = [group.name for group in prefetched['groups']]
+            else:
+                self._group_name_list_cache = list(self.groups.values_list('name', flat=True))
+        return self._group_name_list_cache
+    
+    def get_group_names(self):
+        """
+        Retourne les noms des groupes de l'utilisateur sous forme d'ensemble.
+        
+        Construit à partir de get_group_name_list() (même cache, même requête),
+        pour les tests d'appartenance.
+        
+        Returns:
+            set: Noms des groupes de l'utilisateur
+        """
+        if not hasattr(self, '_group_names_cache'):
+            self._group_names_cache = set(self.get_group_name_list())
+        return self._group_names_cache
+    
     def has_group(self, group_name):
         """
         Vérifie si l'utilisateur appartient à un groupe spécifique.
@@ -207,7 +276,7 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
         Returns:
             bool: True si l'utilisateur appartient au groupe
         """
-        return self.groups.filter(name=group_name).exists()
+        return group_name in self.get_group_names()
 
 
 class UserProfile(models.Model):
@@ -279,12 +348,25 @@ class UserProfile(models.Model):
         Returns:
             bool: True si bio, location, birth_date et website sont renseignés
         """
-        return all([
-            self.bio.strip(),
-            self.location.strip(),
-            self.birth_date,
-            self.website.strip()
-        ])
+        # Chaînage avec and : s'arrête au premier champ vide (cas le plus courant)
+        return (
+            bool(self.bio and self.bio.strip())
+            and bool(self.location and self.location.strip())
+            and self.birth_date is not None
+            and bool(self.website and self.website.strip())
+        )
+
+
+class PasswordResetTokenManager(models.Manager):
+    """
+    Manager des tokens de réinitialisation chargeant l'utilisateur associé.
+    
+    La validation d'un token et son affichage (__str__, vues) accèdent
+    presque toujours à token.user : le JOIN évite une requête par token.
+    """
+    
+    def get_queryset(self):
+        return super().get_queryset().select_related('user')
 
 
 class PasswordResetToken(models.Model):
@@ -293,6 +375,9 @@ class PasswordResetToken(models.Model):
     
     Chaque token est unique et a une durée de vie limitée (24h par défaut).
     Après utilisation ou expiration, le token devient invalide.
+    
+    Seule l'empreinte SHA-256 du token est stockée : le token en clair
+    n'existe que dans le lien envoyé par email.
     """
     
     user = models.ForeignKey(
@@ -302,11 +387,11 @@ class PasswordResetToken(models.Model):
         verbose_name='Utilisateur'
     )
     
-    token = models.CharField(
-        'Token',
-        max_length=100,
+    token_hash = models.BinaryField(
+        'Empreinte du token',
+        max_length=32,
         unique=True,
-        help_text='Token unique pour la réinitialisation'
+        help_text='Empreinte SHA-256 du token de réinitialisation'
     )
     
     created_at = models.DateTimeField(
@@ -325,11 +410,21 @@ class PasswordResetToken(models.Model):
         help_text='Indique si le token a déjà été utilisé'
     )
     
+    # Manager par défaut : charge l'utilisateur avec le token
+    objects = PasswordResetTokenManager()
+    # Manager sans JOIN pour les opérations qui n'ont pas besoin de l'utilisateur
+    raw_objects = models.Manager()
+    
     class Meta:
         verbose_name = 'Token de réinitialisation'
         verbose_name_plural = 'Tokens de réinitialisation'
         db_table = 'auth_password_reset_token'
         ordering = ['-created_at']
+        indexes = [
+            # Utilisé par create_token pour invalider les anciens tokens
+            models.Index(fields=['user', 'used'], name='prt_user_used_idx'),
+            models.Index(fields=['expires_at'], name='prt_expires_at_idx'),
+        ]
     
     def __str__(self):
         return f"Token pour {self.user.email} - {self.created_at.strftime('%d/%m/%Y %H:%M')}"
@@ -351,6 +446,35 @@ class PasswordResetToken(models.Model):
         self.used = True
         self.save()
     
+    @staticmethod
+    def hash_token(token):
+        """
+        Calcule l'empreinte stockée en base pour un token en clair.
+        
+        Args:
+            token (str): Token en clair (tel que reçu dans l'URL)
+            
+        Returns:
+            bytes: Empreinte SHA-256 (32 octets)
+        """
+        return hashlib.sha256(token.encode()).digest()
+    
+    @classmethod
+    def get_by_token(cls, token):
+        """
+        Récupère un token de réinitialisation à partir du token en clair.
+        
+        Args:
+            token (str): Token en clair (tel que reçu dans l'URL)
+            
+        Returns:
+            PasswordResetToken: Le token correspondant
+            
+        Raises:
+            PasswordResetToken.DoesNotExist: Si aucun token ne correspond
+        """
+        return cls.objects.get(token_hash=cls.hash_token(token))
+    
     @classmethod
     def create_token(cls, user):
         """
@@ -360,21 +484,26 @@ class PasswordResetToken(models.Model):
             user (CustomUser): L'utilisateur pour qui créer le token
             
         Returns:
-            PasswordResetToken: Le token créé
+            tuple: (PasswordResetToken créé, token en clair à envoyer)
         """
         import secrets
         from django.utils import timezone
         from datetime import timedelta
         
-        # Invalider tous les anciens tokens de cet utilisateur
-        cls.objects.filter(user=user, used=False).update(used=True)
-        
-        # Créer un nouveau token
+        # Créer un nouveau token (seule son empreinte est enregistrée)
         token = secrets.token_urlsafe(32)
         expires_at = timezone.now() + timedelta(hours=24)  # Expire dans 24h
         
-        return cls.objects.create(
-            user=user,
-            token=token,
-            expires_at=expires_at
-        )
\ No newline at end of file
+        # Invalidation et création dans la même transaction : pas de fenêtre
+        # où deux tokens valides coexistent pour le même utilisateur
+        with transaction.atomic():
+            # Invalider tous les anciens tokens de cet utilisateur
+            cls.raw_objects.filter(user_id=user.pk, used=False).update(used=True)
+            
+            reset_token = cls.raw_objects.create(
+                user=user,
+                token_hash=cls.hash_token(token),
+                expires_at=expires_at
+            )
+        
+        return reset_token, token
\ No newline at end of file
@@ -13,12 +13,74 @@
 # ========================================
 # IMPORTS DJANGO ET PYTHON
 # ========================================
-from functools import wraps                        # Pour préserver les métadonnées des fonctions décorées
+from functools import wraps                        # Métadonnées des fonctions décorées
+from types import MappingProxyType                 # Dictionnaire en lecture seule
 from django.contrib.auth.decorators import login_required  # Décorateur d'authentification Django
+from django.contrib.auth.mixins import UserPassesTestMixin  # Mixin de contrôle d'accès Django
 from django.core.exceptions import PermissionDenied        # Exception pour permissions refusées
-from django.shortcuts import redirect                      # Redirection HTTP
 from django.contrib import messages                        # Système de messages Django
-from django.http import HttpResponseForbidden              # Réponse HTTP 403
+from django.http import HttpResponseForbidden, HttpResponseRedirect, JsonResponse  # Réponses HTTP 403 / 302 / JSON
+from django.urls import reverse_lazy                       # Résolution d'URL différée
+
+
+# ========================================
+# MESSAGES ET URLS DE REDIRECTION
+# ========================================
+# Calculés une seule fois au chargement du module plutôt qu'à chaque refus d'accès
+_ADMIN_DENIED_MSG = 'Accès refusé. Vous devez être administrateur pour accéder à cette page.'
+_CLIENT_DENIED_MSG = 'Accès refusé. Cette page est réservée aux clients.'
+_GROUP_DENIED_MSG = 'Accès refusé. Vous devez appartenir à l\'un de ces groupes: {}'
+_PERMISSION_DENIED_MSG = 'Accès refusé. Permission requise: {}'
+_DASHBOARD_URL = reverse_lazy('dashboard:index')
+
+# Contexte des rôles d'un utilisateur anonyme, partagé (lecture seule) entre
+# tous les appels de get_user_role_context()
+_ANON_ROLE_CONTEXT = MappingProxyType({
+    'is_admin': False,
+    'is_client': False,
+    'user_groups': (),
+    'can_manage_users': False,
+    'can_view_admin_panel': False,
+    'can_manage_subscriptions': False,
+})
+
+
+
+def is_ajax_request(request):
+    """
+    Indique si la requête provient d'un appel AJAX (en-tête X-Requested-With).
+    
+    Lecture directe de request.META, sans passer par request.headers.
+    
+    Args:
+        request: Objet HttpRequest
+        
+    Returns:
+        bool: True pour un appel XMLHttpRequest
+    """
+    return request.META.get('HTTP_X_REQUESTED_WITH') == 'XMLHttpRequest'
+
+
+def _deny(request, msg, *, redirect_to=_DASHBOARD_URL):
+    """
+    Construit la réponse à un refus d'accès.
+    
+    Les appels API/AJAX reçoivent un 403 JSON : aucun message flash n'est
+    ajouté, donc aucune écriture de session pour une réponse qui ne sera
+    jamais affichée. Les navigateurs reçoivent le message et une redirection.
+    
+    Args:
+        request: Objet HttpRequest
+        msg (str): Message de refus
+        redirect_to (str): URL de redirection pour les navigateurs
+        
+    Returns:
+        HttpResponse: JsonResponse 403 ou HttpResponseRedirect
+    """
+    if request.META.get('HTTP_ACCEPT', '').startswith('application/json') or is_ajax_request(request):
+        return JsonResponse({'detail': msg}, status=403)
+    messages.error(request, msg)
+    return HttpResponseRedirect(redirect_to)
 
 
 # ============================================================================
@@ -53,10 +115,8 @@ def admin_required(view_func):
     def _wrapped_view(request, *args, **kwargs):
         # Vérification du rôle administrateur via la propriété is_admin du modèle CustomUser
         if not request.user.is_admin:
-            # Affichage d'un message d'erreur à l'utilisateur
-            messages.error(request, 'Accès refusé. Vous devez être administrateur pour accéder à cette page.')
-            # Redirection vers la page d'accueil du dashboard
-            return redirect('dashboard:index')
+            # Message d'erreur et redirection vers le dashboard (403 JSON pour une API)
+            return _deny(request, _ADMIN_DENIED_MSG)
         
         # Si toutes les vérifications passent, exécute la vue originale
         return view_func(request, *args, **kwargs)
@@ -89,8 +149,7 @@ def client_required(view_func):
     def _wrapped_view(request, *args, **kwargs):
         # Vérification du rôle client via la propriété is_client du modèle CustomUser
         if not request.user.is_client:
-            messages.error(request, 'Accès refusé. Cette page est réservée aux clients.')
-            return redirect('dashboard:index')
+            return _deny(request, _CLIENT_DENIED_MSG)
         return view_func(request, *args, **kwargs)
     return _wrapped_view
 
@@ -119,15 +178,18 @@ def group_required(*group_names):
     Returns:
         Décorateur qui vérifie l'appartenance aux groupes
     """
+    # Ensemble et message calculés une seule fois, à la décoration de la vue
+    required_groups = frozenset(group_names)
+    denied_msg = _GROUP_DENIED_MSG.format(", ".join(group_names))
+    
     def decorator(view_func):
         @wraps(view_func)
         @login_required
         def _wrapped_view(request, *args, **kwargs):
-            # Vérification avec any() : l'utilisateur doit appartenir à AU MOINS UN groupe
-            # has_group() est une méthode personnalisée du modèle CustomUser
-            if not any(request.user.has_group(group) for group in group_names):
-                messages.error(request, f'Accès refusé. Vous devez appartenir à l\'un de ces groupes: {", ".join(group_names)}')
-                return redirect('dashboard:index')
+            # Intersection d'ensembles : l'utilisateur doit appartenir à AU MOINS UN groupe
+            # get_group_names() est mis en cache sur l'utilisateur (une seule requête)
+            if not request.user.get_group_names() & required_groups:
+                return _deny(request, denied_msg)
             return view_func(request, *args, **kwargs)
         return _wrapped_view
     return decorator
@@ -159,15 +221,16 @@ def permission_required_custom(permission_codename):
     Returns:
         Décorateur qui vérifie la permission spécifiée
     """
+    denied_msg = _PERMISSION_DENIED_MSG.format(permission_codename)
+    
     def decorator(view_func):
         @wraps(view_func)
         @login_required
         def _wrapped_view(request, *args, **kwargs):
-            # Vérification de la permission via has_perm() de Django
-            # Cette méthode vérifie les permissions directes ET celles héritées des groupes
-            if not request.user.has_perm(permission_codename):
-                messages.error(request, f'Accès refusé. Permission requise: {permission_codename}')
-                return redirect('dashboard:index')
+            # Vérification via l'ensemble des permissions mis en cache sur l'utilisateur
+            # Cet ensemble contient les permissions directes ET celles héritées des groupes
+            if not has_permission_cached(request.user, permission_codename):
+                return _deny(request, denied_msg)
             return view_func(request, *args, **kwargs)
         return _wrapped_view
     return decorator
@@ -177,187 +240,156 @@ def permission_required_custom(permission_codename):
 # MIXINS POUR VUES BASÉES SUR LES CLASSES
 # ============================================================================
 # Ces mixins s'appliquent aux vues basées sur les classes (Class-Based Views)
-# et surchargent la méthode dispatch() pour vérifier les permissions
+# et vérifient les permissions via UserPassesTestMixin de Django
 
-class AdminRequiredMixin:
+class AccessControlMixin(UserPassesTestMixin):
     """
-    Mixin pour les vues basées sur les classes - accès admin uniquement.
+    Mixin de contrôle d'accès unique pour les vues basées sur les classes.
     
-    Ce mixin surcharge la méthode dispatch() qui est appelée avant toute
-    autre méthode de la vue (get, post, etc.).
+    Repose sur UserPassesTestMixin de Django : toutes les contraintes (rôle
+    admin/client, groupes, permission) forment un seul prédicat, test_func(),
+    évalué par coût croissant : authentification, puis rôles (attributs déjà
+    chargés), puis groupes (ensemble mis en cache), puis permission en
+    dernier. Un utilisateur anonyme est redirigé vers settings.LOGIN_URL
+    (avec le paramètre ?next=) par handle_no_permission() de Django.
     
     Usage :
-        class MaVueAdmin(AdminRequiredMixin, ListView):
-            model = MonModele
-            # Cette vue sera accessible uniquement aux administrateurs
-            
-        class MaVueAdminDetail(AdminRequiredMixin, DetailView):
-            model = MonModele
-            # Cette vue de détail sera aussi protégée
+        class GestionAbonnements(AccessControlMixin, ListView):
+            model = Subscription
+            require_admin = True
+            required_permission = 'subscription.change_subscription'
+    
+    Attributes:
+        require_admin (bool): Réserve la vue aux administrateurs
+        require_client (bool): Réserve la vue aux clients
+        required_groups (list): Groupes autorisés (au moins un requis)
+        required_permission (str): Permission requise au format 'app.action_model'
     
     Note :
+        L'authentification est toujours exigée, même sans autre contrainte
+        déclarée (ex. PermissionRequiredMixin sans required_permission).
         Ce mixin doit être placé AVANT la classe de vue Django dans l'héritage
         pour que la méthode dispatch() soit correctement surchargée.
     """
-    
-    def dispatch(self, request, *args, **kwargs):
+    # Attributs de classe à surcharger dans les vues filles
+    require_admin = False
+    require_client = False
+    required_groups = []
+    required_permission = None
+    _required_group_set = frozenset()
+    _check_groups = False
+    _group_denied_msg = ''
+    _permission_denied_msg = ''
+    
+    def __init_subclass__(cls, **kwargs):
+        """Précalcule l'ensemble des groupes requis et les messages de refus pour chaque vue fille."""
+        super().__init_subclass__(**kwargs)
+        cls._required_group_set = frozenset(cls.required_groups)
+        # GroupRequiredMixin vérifie toujours les groupes : une liste vide refuse l'accès
+        cls._check_groups = cls._check_groups or bool(cls._required_group_set)
+        cls._group_denied_msg = _GROUP_DENIED_MSG.format(", ".join(cls.required_groups))
+        cls._permission_denied_msg = _PERMISSION_DENIED_MSG.format(cls.required_permission)
+    
+    def test_func(self):
         """
-        Méthode appelée avant toute autre méthode de la vue.
-        Vérifie l'authentification et les permissions administrateur.
+        Prédicat unique vérifiant chaque contrainte déclarée sur la vue.
+        
+        Mémorise le message de refus de la première contrainte non satisfaite
+        pour handle_no_permission().
         
-        Args:
-            request: Objet HttpRequest
-            *args: Arguments positionnels
-            **kwargs: Arguments nommés
-            
         Returns:
-            HttpResponse: Redirection si accès refusé, sinon appel de la vue parente
+            bool: True si l'utilisateur satisfait toutes les contraintes
         """
+        user = self.request.user
+        
         # Vérification de l'authentification
-        if not request.user.is_authenticated:
-            return redirect('auth:login')
+        if not user.is_authenticated:
+            return False
         
         # Vérification du rôle administrateur
-        if not request.user.is_admin:
-            messages.error(request, 'Accès refusé. Vous devez être administrateur pour accéder à cette page.')
-            return redirect('dashboard:index')
+        if self.require_admin and not user.is_admin:
+            self._denied_msg = _ADMIN_DENIED_MSG
+        # Vérification du rôle client
+        elif self.require_client and not user.is_client:
+            self._denied_msg = _CLIENT_DENIED_MSG
+        # Vérification de l'appartenance à au moins un des groupes requis
+        elif self._check_groups and not user.get_group_names() & self._required_group_set:
+            self._denied_msg = self._group_denied_msg
+        # Vérification de la permission (la plus coûteuse) en dernier
+        elif self.required_permission and not has_permission_cached(user, self.required_permission):
+            self._denied_msg = self._permission_denied_msg
+        else:
+            return True
+        return False
+    
+    def handle_no_permission(self):
+        """
+        Redirige un utilisateur connecté mais non autorisé vers le dashboard.
         
-        # Si toutes les vérifications passent, appel de la méthode dispatch() parente
-        return super().dispatch(request, *args, **kwargs)
+        Returns:
+            HttpResponse: Redirection avec message d'erreur ; pour un
+            utilisateur anonyme, comportement de Django (page de connexion)
+        """
+        if not self.request.user.is_authenticated:
+            return super().handle_no_permission()
+        return _deny(self.request, self._denied_msg)
 
 
-class ClientRequiredMixin:
+class AdminRequiredMixin(AccessControlMixin):
     """
-    Mixin pour les vues basées sur les classes - accès client uniquement.
+    Mixin pour les vues basées sur les classes - accès admin uniquement.
     
-    Similaire à AdminRequiredMixin mais pour les clients.
-    Utile pour protéger des vues spécifiques aux fonctionnalités client.
+    Usage :
+        class MaVueAdmin(AdminRequiredMixin, ListView):
+            model = MonModele
+            # Cette vue sera accessible uniquement aux administrateurs
+            
+        class MaVueAdminDetail(AdminRequiredMixin, DetailView):
+            model = MonModele
+            # Cette vue de détail sera aussi protégée
+    """
+    require_admin = True
+
+
+class ClientRequiredMixin(AccessControlMixin):
+    """
+    Mixin pour les vues basées sur les classes - accès client uniquement.
     
     Usage :
         class MonTableauDeBord(ClientRequiredMixin, TemplateView):
             template_name = 'client/dashboard.html'
             # Accessible uniquement aux clients
-            
-        class MesAbonnements(ClientRequiredMixin, ListView):
-            model = Subscription
-            # Liste des abonnements accessible uniquement aux clients
     """
-    
-    def dispatch(self, request, *args, **kwargs):
-        """
-        Vérifie l'authentification et les permissions client.
-        
-        Args:
-            request: Objet HttpRequest
-            *args: Arguments positionnels
-            **kwargs: Arguments nommés
-            
-        Returns:
-            HttpResponse: Redirection si accès refusé, sinon appel de la vue parente
-        """
-        # Vérification de l'authentification
-        if not request.user.is_authenticated:
-            return redirect('auth:login')
-        
-        # Vérification du rôle client
-        if not request.user.is_client:
-            messages.error(request, 'Accès refusé. Cette page est réservée aux clients.')
-            return redirect('dashboard:index')
-        
-        # Appel de la méthode dispatch() parente
-        return super().dispatch(request, *args, **kwargs)
+    require_client = True
 
 
-class GroupRequiredMixin:
+class GroupRequiredMixin(AccessControlMixin):
     """
     Mixin pour les vues basées sur les classes - accès par groupe.
     
-    Ce mixin permet de restreindre l'accès aux utilisateurs appartenant
-    à des groupes spécifiques. Plus flexible que les mixins de rôle.
-    
     Usage :
         class MaVueModerateur(GroupRequiredMixin, ListView):
             model = MonModele
             required_groups = ['admin', 'moderator']  # Admin OU modérateur
-            
-        class MaVuePremium(GroupRequiredMixin, DetailView):
-            model = MonModele
-            required_groups = ['premium_users']  # Uniquement utilisateurs premium
     
     Attributes:
         required_groups (list): Liste des noms de groupes autorisés
     """
-    # Attribut de classe à surcharger dans les vues filles
-    required_groups = []
-    
-    def dispatch(self, request, *args, **kwargs):
-        """
-        Vérifie l'authentification et l'appartenance aux groupes requis.
-        
-        Args:
-            request: Objet HttpRequest
-            *args: Arguments positionnels
-            **kwargs: Arguments nommés
-            
-        Returns:
-            HttpResponse: Redirection si accès refusé, sinon appel de la vue parente
-        """
-        # Vérification de l'authentification
-        if not request.user.is_authenticated:
-            return redirect('auth:login')
-        
-        # Vérification de l'appartenance à au moins un des groupes requis
-        if not any(request.user.has_group(group) for group in self.required_groups):
-            messages.error(request, f'Accès refusé. Vous devez appartenir à l\'un de ces groupes: {", ".join(self.required_groups)}')
-            return redirect('dashboard:index')
-        
-        return super().dispatch(request, *args, **kwargs)
+    _check_groups = True
 
 
-class PermissionRequiredMixin:
+class PermissionRequiredMixin(AccessControlMixin):
     """
     Mixin pour les vues basées sur les classes - vérification de permission.
     
-    Ce mixin offre un contrôle d'accès granulaire basé sur des permissions
-    spécifiques plutôt que sur des rôles ou groupes.
-    
     Usage :
         class CreerAbonnement(PermissionRequiredMixin, CreateView):
             model = Subscription
             required_permission = 'subscription.add_subscription'
-            
-        class ModifierUtilisateur(PermissionRequiredMixin, UpdateView):
-            model = CustomUser
-            required_permission = 'auth.change_user'
     
     Attributes:
         required_permission (str): Nom de la permission requise au format 'app.action_model'
     """
-    # Attribut de classe à surcharger dans les vues filles
-    required_permission = None
-    
-    def dispatch(self, request, *args, **kwargs):
-        """
-        Vérifie l'authentification et la permission requise.
-        
-        Args:
-            request: Objet HttpRequest
-            *args: Arguments positionnels
-            **kwargs: Arguments nommés
-            
-        Returns:
-            HttpResponse: Redirection si accès refusé, sinon appel de la vue parente
-        """
-        # Vérification de l'authentification
-        if not request.user.is_authenticated:
-            return redirect('auth:login')
-        
-        # Vérification de la permission si elle est définie
-        if self.required_permission and not request.user.has_perm(self.required_permission):
-            messages.error(request, f'Accès refusé. Permission requise: {self.required_permission}')
-            return redirect('dashboard:index')
-        
-        return super().dispatch(request, *args, **kwargs)
 
 
 # ============================================================================
@@ -366,6 +398,45 @@ class PermissionRequiredMixin:
 # Ces fonctions fournissent des outils pour vérifier les permissions et
 # récupérer le contexte des rôles utilisateur dans les templates.
 
+def get_all_permissions_cached(user):
+    """
+    Retourne l'ensemble des permissions de l'utilisateur, mis en cache sur l'instance.
+    
+    Les permissions sont chargées une seule fois par instance d'utilisateur
+    (donc une fois par requête pour request.user) ; les vérifications
+    suivantes sont de simples tests d'appartenance à un ensemble.
+    
+    Args:
+        user (CustomUser): L'utilisateur dont on veut les permissions
+        
+    Returns:
+        set: Permissions au format 'app.action_model'
+    """
+    if not hasattr(user, '_all_perms_cache'):
+        user._all_perms_cache = user.get_all_permissions()
+    return user._all_perms_cache
+
+
+def has_permission_cached(user, permission):
+    """
+    Équivalent de user.has_perm() s'appuyant sur get_all_permissions_cached().
+    
+    Utilisé par les décorateurs et les mixins : plusieurs vérifications au
+    cours d'une même requête ne déclenchent qu'un seul chargement des permissions.
+    
+    Args:
+        user (CustomUser): L'utilisateur à vérifier
+        permission (str): Permission au format 'app.action_model'
+        
+    Returns:
+        bool: True si l'utilisateur possède la permission
+    """
+    # Un superutilisateur actif a toutes les permissions, comme avec has_perm()
+    if user.is_active and user.is_superuser:
+        return True
+    return permission in get_all_permissions_cached(user)
+
+
 def check_user_permissions(user, required_permissions):
     """
     Vérifie si l'utilisateur a toutes les permissions spécifiées.
@@ -401,15 +472,16 @@ def check_user_permissions(user, required_permissions):
     if user.is_superuser:
         return True
     
-    # Conversion en liste si c'est une chaîne
+    # Conversion en tuple si c'est une chaîne
     if isinstance(required_permissions, str):
-        required_permissions = [required_permissions]
+        required_permissions = (required_permissions,)
     
-    # Vérification que l'utilisateur a TOUTES les permissions
-    return all(user.has_perm(perm) for perm in required_permissions)
+    # Vérification que l'utilisateur a TOUTES les permissions : un seul
+    # chargement (mis en cache) puis un test d'inclusion d'ensembles
+    return get_all_permissions_cached(user).issuperset(required_permissions)
 
 
-def get_user_role_context(user):
+def get_user_role_context(user, request=None):
     """
     Retourne le contexte des rôles de l'utilisateur pour les templates.
     
@@ -417,8 +489,15 @@ def get_user_role_context(user):
     de rôles et permissions d'un utilisateur, formatées pour être utilisées
     facilement dans les templates Django.
     
+    Le dictionnaire est calculé une seule fois par requête : il est mémorisé
+    sur la requête si elle est fournie, sinon sur l'instance de l'utilisateur
+    (sa durée de vie est alors celle de l'instance, sans cache global).
+    Pour un utilisateur anonyme, un contexte constant en lecture seule est
+    retourné.
+    
     Args:
         user (CustomUser): L'utilisateur pour lequel récupérer le contexte
+        request (HttpRequest, optionnel): Requête courante servant de cache
         
     Returns:
         dict: Dictionnaire contenant:
@@ -442,34 +521,46 @@ def get_user_role_context(user):
         {% endif %}
         
     Usage dans les vues:
-        context = get_user_role_context(request.user)
+        context = get_user_role_context(request.user, request)
         if context['is_admin']:
             # Logique spécifique aux admins
     """
-    # Gestion des utilisateurs non authentifiés
+    # Utilisateurs non authentifiés : contexte constant partagé, rien à calculer
     if not user.is_authenticated:
-        return {
-            'is_admin': False,
-            'is_client': False,
-            'user_groups': [],
-            'can_manage_users': False,
-            'can_view_admin_panel': False,
-        }
+        return _ANON_ROLE_CONTEXT
+    
+    # Contexte déjà calculé pendant cette requête (ou pour cette instance)
+    cache_owner = request if request is not None else user
+    cached = getattr(cache_owner, '_role_context_cache', None)
+    if cached is not None:
+        return cached
+    cache_owner._role_context_cache = _build_user_role_context(user)
+    return cache_owner._role_context_cache
+
+
+def _build_user_role_context(user):
+    """Construit le contexte des rôles (voir get_user_role_context)."""
+    # Récupération des noms de groupes (chaînes, sans instancier de Group),
+    # dans l'ordre de la base ; get_group_name_list() réutilise un
+    # préchargement éventuel et son cache
+    user_groups = user.get_group_name_list()
     
-    # Récupération des groupes de l'utilisateur
-    user_groups = [group.name for group in user.groups.all()]
+    # Test de rôle (sans requête) évalué en premier : les administrateurs ne
+    # déclenchent jamais le chargement des permissions
+    is_admin = user.is_admin
     
     # Construction du contexte pour les utilisateurs authentifiés
     return {
         # Vérification des rôles principaux via les propriétés du modèle
-        'is_admin': user.is_admin,
+        'is_admin': is_admin,
         'is_client': user.is_client,
         
         # Liste de tous les groupes de l'utilisateur
         'user_groups': user_groups,
         
         # Permissions dérivées pour l'interface utilisateur
-        'can_manage_users': user.has_perm('auth.change_user') or user.is_admin,
-        'can_view_admin_panel': user.is_staff or user.is_admin,
-        'can_manage_subscriptions': user.has_perm('subscription.change_subscription') or user.is_admin,
+        # (get_all_permissions_cached ne charge les permissions qu'une seule fois)
+        'can_manage_users': is_admin or 'auth.change_user' in get_all_permissions_cached(user),
+        'can_view_admin_panel': is_admin or user.is_staff,
+        'can_manage_subscriptions': is_admin or 'subscription.change_subscription' in get_all_permissions_cached(user),
     }
\ No newline at end of file
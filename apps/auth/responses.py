@@ -0,0 +1,20 @@
+import orjson
+from django.http import HttpResponse
+
+
+class ORJSONResponse(HttpResponse):
+    """
+    Réponse JSON sérialisée par orjson (extension C).
+    
+    Remplace JsonResponse sur les API appelées fréquemment : l'encodage est
+    plusieurs fois plus rapide que json + DjangoJSONEncoder, et les dates
+    (datetime, date) sont sérialisées nativement au format ISO 8601.
+    
+    Args:
+        data: Données à sérialiser (dict, list...)
+        **kwargs: Arguments passés à HttpResponse (status, headers...)
+    """
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(orjson.dumps(data, option=orjson.OPT_NAIVE_UTC), **kwargs)
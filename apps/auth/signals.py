@@ -1,25 +1,63 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
 from django.contrib.auth.models import Group
+from django.core.cache import cache
+from apps.subscription.models import Plan, Subscription
 from .models import CustomUser, UserProfile
 
+# Version du fragment de liste mis en cache par UserListView : supprimer la
+# clé fait changer la version, donc la clé de chaque page du fragment
+USER_LIST_VERSION_CACHE_KEY = 'user_list:version'
 
-@receiver(post_save, sender=CustomUser)
+# Catalogue des plans payants proposé par migrate_user_to_paid
+PAID_PLANS_CACHE_KEY = 'paid_plans:v1'
+PAID_PLANS_CACHE_TIMEOUT = 3600
+
+# Réponse de user_info_api mise en cache par utilisateur et par connexion
+USER_INFO_CACHE_TIMEOUT = 300
+
+
+def user_info_cache_key(user_id, last_login):
+    """
+    Construit la clé du cache de user_info_api.
+    
+    La date de dernière connexion fait partie de la clé : une nouvelle
+    connexion repart d'une entrée vide sans invalidation explicite.
+    
+    Args:
+        user_id (int): Identifiant de l'utilisateur
+        last_login (datetime): Dernière connexion (None si jamais connecté)
+        
+    Returns:
+        str: Clé de cache
+    """
+    return f'userinfo:{user_id}:{int(last_login.timestamp()) if last_login else 0}'
+
+
+def _invalidate_user_info(users):
+    """Supprime l'entrée user_info_api de chaque utilisateur (couples pk, last_login)."""
+    cache.delete_many([user_info_cache_key(pk, last_login) for pk, last_login in users])
+
+
+def get_role_group_id(name):
+    """Retourne l'identifiant du groupe de rôle, créé au besoin."""
+    return Group.objects.get_or_create(name=name)[0].pk
+
+
+@receiver(post_save, sender=CustomUser, dispatch_uid='custom_auth.create_user_profile')
 def create_user_profile(sender, instance, created, **kwargs):
     """Crée automatiquement un profil utilisateur lors de la création d'un utilisateur."""
     if created:
-        UserProfile.objects.create(user=instance)
-        
-        # Assigner automatiquement l'utilisateur au groupe approprié
-        if instance.user_type == 'admin':
-            admin_group, _ = Group.objects.get_or_create(name='admin')
-            instance.groups.add(admin_group)
-        elif instance.user_type == 'client':
-            client_group, _ = Group.objects.get_or_create(name='client')
-            instance.groups.add(client_group)
+        # Profil et groupe sont enregistrés ensemble
+        with transaction.atomic():
+            UserProfile.objects.create(user=instance)
+            
+            # Assigner automatiquement l'utilisateur au groupe approprié
+            if instance.user_type in ('admin', 'client'):
+                instance.groups.add(get_role_group_id(instance.user_type))
         
         # Assigner automatiquement le plan gratuit à tous les nouveaux utilisateurs
-        from apps.subscription.models import Plan, Subscription
         try:
             free_plan = Plan.objects.get(slug='gratuit')
             Subscription.objects.create(
@@ -31,8 +69,58 @@ def create_user_profile(sender, instance, created, **kwargs):
             pass  # Le plan gratuit n'existe pas encore
 
 
-@receiver(post_save, sender=CustomUser)
-def save_user_profile(sender, instance, **kwargs):
-    """Sauvegarde le profil utilisateur lors de la sauvegarde de l'utilisateur."""
-    if hasattr(instance, 'profile'):
-        instance.profile.save()
\ No newline at end of file
+# Pas de receiver re-sauvegardant le profil à chaque CustomUser.save() :
+# il coûtait un SELECT et un UPDATE inutiles (y compris à chaque connexion,
+# via last_login). Les vues qui modifient le profil l'enregistrent elles-mêmes.
+
+
+@receiver([post_save, post_delete], sender=CustomUser, dispatch_uid='custom_auth.invalidate_user_info')
+def invalidate_user_info(sender, instance, **kwargs):
+    """Invalide user_info_api lorsque l'utilisateur est modifié ou supprimé."""
+    _invalidate_user_info([(instance.pk, instance.last_login)])
+
+
+@receiver(m2m_changed, sender=CustomUser.groups.through, dispatch_uid='custom_auth.invalidate_user_info_groups')
+@receiver(m2m_changed, sender=CustomUser.user_permissions.through, dispatch_uid='custom_auth.invalidate_user_info_perms')
+def invalidate_user_info_m2m(sender, instance, action, reverse, pk_set, **kwargs):
+    """Invalide user_info_api lorsque les groupes ou permissions d'un utilisateur changent."""
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        _invalidate_user_info([(instance.pk, instance.last_login)])
+    else:
+        # Modification côté groupe/permission (group.user_set...) : pk_set
+        # contient les utilisateurs concernés (None pour un clear())
+        users = CustomUser.objects.filter(pk__in=pk_set) if pk_set else CustomUser.objects.none()
+        _invalidate_user_info(users.values_list('pk', 'last_login'))
+
+
+@receiver(m2m_changed, sender=Group.permissions.through, dispatch_uid='custom_auth.invalidate_user_info_group_perms')
+def invalidate_user_info_group_permissions(sender, instance, action, reverse, **kwargs):
+    """Invalide user_info_api des membres d'un groupe dont les permissions changent."""
+    if not action.startswith('post_') or reverse:
+        return
+    _invalidate_user_info(instance.user_set.values_list('pk', 'last_login'))
+
+
+@receiver([post_save, post_delete], sender=CustomUser, dispatch_uid='custom_auth.invalidate_user_list')
+@receiver(m2m_changed, sender=CustomUser.groups.through, dispatch_uid='custom_auth.invalidate_user_list_groups')
+def invalidate_user_list(sender, **kwargs):
+    """Invalide le fragment de la liste des utilisateurs (toutes les pages)."""
+    cache.delete(USER_LIST_VERSION_CACHE_KEY)
+
+
+def invalidate_plan_cache():
+    """
+    Invalide le catalogue des plans payants en cache.
+    
+    Appelée aussi par les actions d'administration qui modifient les plans
+    avec queryset.update(), lequel n'émet aucun signal post_save.
+    """
+    cache.delete(PAID_PLANS_CACHE_KEY)
+
+
+@receiver([post_save, post_delete], sender=Plan, dispatch_uid='custom_auth.invalidate_paid_plans')
+def invalidate_paid_plans(sender, **kwargs):
+    """Invalide le cache des plans lorsqu'un plan est modifié ou supprimé."""
+    invalidate_plan_cache()
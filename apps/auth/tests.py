@@ -0,0 +1,60 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser, Group
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+from django.views import View
+
+from .permissions import GroupRequiredMixin, PermissionRequiredMixin, get_user_role_context
+
+
+class _OkView(View):
+    def get(self, request, *args, **kwargs):
+        return HttpResponse('ok')
+
+
+class PermissionSansContrainteView(PermissionRequiredMixin, _OkView):
+    pass
+
+
+class GroupesVidesView(GroupRequiredMixin, _OkView):
+    required_groups = []
+
+
+class AccessControlMixinTests(SimpleTestCase):
+    """Contrôle d'accès des mixins pour les vues basées sur les classes."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def _get_anonymous(self, view_class):
+        request = self.factory.get('/protegee/')
+        request.user = AnonymousUser()
+        return view_class.as_view()(request)
+
+    def test_permission_mixin_sans_permission_redirige_anonyme(self):
+        response = self._get_anonymous(PermissionSansContrainteView)
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response.url.startswith('/auth/login/'))
+
+    def test_group_mixin_sans_groupe_redirige_anonyme(self):
+        response = self._get_anonymous(GroupesVidesView)
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response.url.startswith('/auth/login/'))
+
+    def test_group_mixin_sans_groupe_refuse_utilisateur_connecte(self):
+        user = get_user_model()(email='client@test.com', is_active=True)
+        user._group_names_cache = {'client'}
+        view = GroupesVidesView()
+        view.setup(self.factory.get('/protegee/'))
+        view.request.user = user
+        self.assertFalse(view.test_func())
+
+
+class UserRoleContextTests(SimpleTestCase):
+    """Contexte des rôles fourni aux templates."""
+
+    def test_user_groups_conserve_ordre_de_la_base(self):
+        user = get_user_model()(email='admin@saas.com', user_type='admin', is_active=True)
+        user._prefetched_objects_cache = {'groups': [Group(name='moderator'), Group(name='admin')]}
+        context = get_user_role_context(user)
+        self.assertEqual(context['user_groups'], ['moderator', 'admin'])
@@ -1,8 +1,19 @@
-from django.urls import path
+from django.urls import include, path
 from . import views
 
 app_name = 'auth'
 
+# Actions d'administration sur un utilisateur, regroupées sous un préfixe
+# commun : le résolveur ne teste le motif users/<int:user_id>/ qu'une fois
+user_admin_patterns = [
+    path('toggle-status/', views.toggle_user_status, name='toggle_user_status'),
+    path('change-type/', views.change_user_type, name='change_user_type'),
+    
+    # Migration d'abonnement (admin uniquement)
+    path('migrate-to-paid/', views.migrate_user_to_paid, name='migrate_user_to_paid'),
+    path('migrate-to-free/', views.migrate_user_to_free, name='migrate_user_to_free'),
+]
+
 urlpatterns = [
     # Authentification
     path('login/', views.CustomLoginView.as_view(), name='login'),
@@ -19,16 +30,11 @@ urlpatterns = [
     
     # Gestion des utilisateurs (admin uniquement)
     path('users/', views.UserListView.as_view(), name='user_list'),
-    path('users/<int:user_id>/toggle-status/', views.toggle_user_status, name='toggle_user_status'),
-    path('users/<int:user_id>/change-type/', views.change_user_type, name='change_user_type'),
+    path('users/<int:user_id>/', include(user_admin_patterns)),
     
     # API
     path('api/user-info/', views.user_info_api, name='user_info_api'),
     
-    # Migration d'abonnement (admin uniquement)
-    path('users/<int:user_id>/migrate-to-paid/', views.migrate_user_to_paid, name='migrate_user_to_paid'),
-    path('users/<int:user_id>/migrate-to-free/', views.migrate_user_to_free, name='migrate_user_to_free'),
-    
     # Redirection
     path('dashboard-redirect/', views.dashboard_redirect, name='dashboard_redirect'),
 ]
\ No newline at end of file
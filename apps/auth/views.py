@@ -1,35 +1,78 @@
 # === IMPORTS DJANGO CORE ===
+import hashlib
+import logging
+import time
+from datetime import timedelta
+# Parsing JSON rapide des corps de requête
+import orjson
 from django.shortcuts import render, redirect
 # Fonctions d'authentification Django
-from django.contrib.auth import login, logout, authenticate
+from django.contrib.auth import login, logout, authenticate, SESSION_KEY
+# Permissions Django
+from django.contrib.auth.models import Group, Permission
 # Décorateur pour protéger les vues
 from django.contrib.auth.decorators import login_required
 # Vues génériques d'authentification
 from django.contrib.auth.views import LoginView, LogoutView
 # Vues génériques basées sur les classes
-from django.views.generic import CreateView, UpdateView, DetailView
+from django.views.generic import CreateView, UpdateView, DetailView, ListView
 # Mixin pour protéger les vues basées sur les classes
 from django.contrib.auth.mixins import LoginRequiredMixin
 # Système de messages Django
 from django.contrib import messages
-# URLs avec évaluation paresseuse
-from django.urls import reverse_lazy
-# Réponses JSON pour les API
-from django.http import JsonResponse
+# Résolution d'URLs (immédiate et paresseuse)
+from django.urls import reverse, reverse_lazy
+# Dates avec fuseau horaire
+from django.utils import timezone
+# Réponses HTTP, JSON et redirections
+from django.http import HttpResponse, HttpResponseRedirect
+# Réponses conditionnelles (ETag)
+from django.utils.cache import get_conditional_response
 # Décorateurs pour les méthodes HTTP
 from django.views.decorators.http import require_http_methods
 # Protection CSRF
 from django.views.decorators.csrf import csrf_exempt
 # Utilitaires pour les décorateurs
 from django.utils.decorators import method_decorator
+# Propriétés calculées une seule fois par instance
+from django.utils.functional import cached_property
+# Cache (Redis en production)
+from django.core.cache import cache
+# Transactions et agrégations
+from django.db import transaction
+from django.db.models import Count, Prefetch, Q, prefetch_related_objects
 
 # === IMPORTS LOCAUX ===
 # Nos modèles personnalisés
-from .models import CustomUser, UserProfile
+from .models import CustomUser, UserProfile, PasswordResetToken
 # Nos formulaires personnalisés
 from .forms import CustomUserCreationForm, CustomAuthenticationForm, UserProfileForm, CustomUserUpdateForm, PasswordResetRequestForm, PasswordResetConfirmForm
+# Envoi des emails hors de la requête
+from .emails import send_mail_in_background
 # Nos permissions personnalisées
-from .permissions import admin_required, AdminRequiredMixin
+from .permissions import admin_required, AdminRequiredMixin, is_ajax_request
+# Réponse JSON rapide (orjson) pour les API
+from .responses import ORJSONResponse
+# Clé et durée du cache de user_info_api
+from .signals import (
+    user_info_cache_key, USER_INFO_CACHE_TIMEOUT, USER_LIST_VERSION_CACHE_KEY,
+    PAID_PLANS_CACHE_KEY, PAID_PLANS_CACHE_TIMEOUT, get_role_group_id,
+)
+# Modèles d'abonnement (migrations de plan)
+from apps.subscription.models import Plan, Subscription, SubscriptionHistory
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+
+# URLs de redirection (résolues à l'utilisation)
+_DASHBOARD_URL = reverse_lazy('dashboard:index')
+_ADMIN_DASHBOARD_URL = reverse_lazy('dashboard:admin')
+_CLIENT_DASHBOARD_URL = reverse_lazy('dashboard:client')
+
+# Limite des demandes de réinitialisation de mot de passe par adresse email
+PASSWORD_RESET_MAX_REQUESTS = 3
+PASSWORD_RESET_WINDOW = 3600  # En secondes
 
 
 class CustomLoginView(LoginView):
@@ -52,6 +95,26 @@ class CustomLoginView(LoginView):
     # Redirige automatiquement les utilisateurs déjà connectés
     redirect_authenticated_user = True
     
+    def dispatch(self, request, *args, **kwargs):
+        """
+        Redirige un utilisateur déjà connecté sans charger son compte.
+        
+        Pour un GET sans paramètre next, la présence de l'identifiant dans
+        la session suffit (simple lecture de dictionnaire, pas de requête
+        sur la table des utilisateurs). Avec next, la page de connexion a
+        été atteinte depuis une page protégée : la session peut être périmée
+        (compte désactivé ou supprimé), on laisse donc LoginView faire la
+        vérification complète pour éviter une boucle de redirections.
+        
+        Returns:
+            HttpResponse: Redirection vers le dashboard ou page de connexion
+        """
+        if (request.method in ('GET', 'HEAD')
+                and self.redirect_field_name not in request.GET
+                and SESSION_KEY in request.session):
+            return HttpResponseRedirect(self.get_success_url())
+        return super().dispatch(request, *args, **kwargs)
+    
     def get_success_url(self):
         """
         Détermine l'URL de redirection après connexion réussie.
@@ -59,7 +122,7 @@ class CustomLoginView(LoginView):
         Returns:
             str: URL vers le dashboard
         """
-        return reverse_lazy('dashboard:index')
+        return _DASHBOARD_URL
     
     def form_valid(self, form):
         """
@@ -116,8 +179,10 @@ class CustomLogoutView(LogoutView):
         Returns:
             HttpResponse: Redirection après déconnexion
         """
-        # Message informatif avant la déconnexion
-        messages.info(request, 'Vous avez été déconnecté avec succès.')
+        # Message informatif avant la déconnexion, uniquement si une session
+        # est réellement fermée (pas de message stocké pour un anonyme ou un robot)
+        if request.user.is_authenticated:
+            messages.info(request, 'Vous avez été déconnecté avec succès.')
         return super().dispatch(request, *args, **kwargs)
 
 
@@ -201,25 +266,32 @@ class ProfileView(LoginRequiredMixin, DetailView):
         """
         Retourne l'utilisateur à afficher (toujours l'utilisateur connecté).
         
+        Le profil est déjà joint par CustomUserBackend ; les groupes, lus
+        plusieurs fois par le template, sont préchargés en une requête.
+        
         Returns:
             CustomUser: L'utilisateur connecté
         """
-        return self.request.user
+        user = self.request.user
+        prefetch_related_objects([user], 'groups')
+        return user
     
     def get_context_data(self, **kwargs):
         """
-        Ajoute les formulaires de modification au contexte.
+        Ajoute le formulaire de profil au contexte.
+        
+        Seul le formulaire de profil est rendu par auth/profile.html : le
+        formulaire des informations utilisateur n'est construit que par
+        ProfileUpdateView.
         
         Args:
             **kwargs: Arguments du contexte parent
             
         Returns:
-            dict: Contexte enrichi avec les formulaires
+            dict: Contexte enrichi avec le formulaire de profil
         """
         context = super().get_context_data(**kwargs)
-        # Formulaire pour modifier les infos utilisateur
-        context['user_form'] = CustomUserUpdateForm(instance=self.request.user)
-        # Formulaire pour modifier le profil
+        # Formulaire pour modifier le profil (profil déjà joint à request.user)
         context['profile_form'] = UserProfileForm(instance=self.request.user.profile)
         return context
 
@@ -234,24 +306,39 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
     def get_object(self):
         return self.request.user
     
+    @cached_property
+    def profile_form(self):
+        """
+        Formulaire du profil, construit une seule fois par requête.
+        
+        La vue étant instanciée à chaque requête, post() et get_context_data()
+        partagent la même instance (liée aux données POST le cas échéant).
+        """
+        if self.request.POST:
+            return UserProfileForm(self.request.POST, instance=self.request.user.profile)
+        return UserProfileForm(instance=self.request.user.profile)
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        if self.request.POST:
-            context['profile_form'] = UserProfileForm(self.request.POST, instance=self.request.user.profile)
-        else:
-            context['profile_form'] = UserProfileForm(instance=self.request.user.profile)
+        context.setdefault('profile_form', self.profile_form)
         return context
     
     def post(self, request, *args, **kwargs):
         """Gère la soumission du formulaire avec validation des deux formulaires."""
         self.object = self.get_object()
         user_form = self.get_form()
-        profile_form = UserProfileForm(request.POST, instance=request.user.profile)
+        profile_form = self.profile_form
         
         if user_form.is_valid() and profile_form.is_valid():
-            # Sauvegarder les deux formulaires
-            user_form.save()
-            profile_form.save()
+            # Sauvegarder les deux formulaires dans une seule transaction, en
+            # n'écrivant que les champs modifiés (aucune requête si rien n'a changé)
+            if user_form.has_changed() or profile_form.has_changed():
+                with transaction.atomic():
+                    if user_form.has_changed():
+                        user_form.save(commit=False).save(update_fields=user_form.changed_data)
+                    if profile_form.has_changed():
+                        # updated_at (auto_now) n'est mis à jour que s'il est listé
+                        profile_form.save(commit=False).save(update_fields=[*profile_form.changed_data, 'updated_at'])
             messages.success(request, 'Profil mis à jour avec succès!')
             return redirect(self.success_url)
         else:
@@ -267,42 +354,77 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
         return super().form_invalid(form)
 
 
-class UserListView(AdminRequiredMixin, LoginRequiredMixin, DetailView):
+class UserListView(AdminRequiredMixin, ListView):
     """Vue pour lister tous les utilisateurs (admin uniquement)."""
     template_name = 'auth/user_list.html'
+    context_object_name = 'users'
+    paginate_by = 50
     
-    def get(self, request, *args, **kwargs):
-        users = CustomUser.objects.all().select_related('profile').prefetch_related('groups')
-        context = {
-            'users': users,
-            'total_users': users.count(),
-            'admin_users': users.filter(user_type='admin').count(),
-            'client_users': users.filter(user_type='client').count(),
-        }
-        return render(request, self.template_name, context)
+    def get_queryset(self):
+        """
+        Retourne la page d'utilisateurs, limitée aux champs affichés.
+        
+        Returns:
+            QuerySet: Utilisateurs avec leurs groupes (noms uniquement) préchargés
+        """
+        return (
+            CustomUser.objects
+            .only('id', 'email', 'first_name', 'last_name', 'user_type', 'is_active',
+                  'is_superuser', 'date_joined', 'last_login')
+            .prefetch_related(Prefetch('groups', queryset=Group.objects.only('name')))
+            .order_by('-date_joined')
+        )
+    
+    @cached_property
+    def stats(self):
+        """Statistiques en une seule requête (comptages conditionnels)."""
+        return CustomUser.objects.aggregate(
+            total=Count('id'),
+            admins=Count('id', filter=Q(user_type='admin')),
+            clients=Count('id', filter=Q(user_type='client')),
+        )
+    
+    def get_paginator(self, *args, **kwargs):
+        paginator = super().get_paginator(*args, **kwargs)
+        paginator.count = self.stats['total']  # Total déjà connu : pas de COUNT supplémentaire
+        return paginator
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update({
+            # Version du fragment mis en cache dans le template ; tant que le
+            # fragment est en cache, la page d'utilisateurs n'est pas requêtée
+            'list_version': cache.get_or_set(USER_LIST_VERSION_CACHE_KEY, time.time_ns),
+            'total_users': self.stats['total'],
+            'admin_users': self.stats['admins'],
+            'client_users': self.stats['clients'],
+        })
+        return context
 
 
 @admin_required
 def toggle_user_status(request, user_id):
     """Vue pour activer/désactiver un utilisateur (admin uniquement)."""
+    # Les appels AJAX reçoivent du JSON : pas de message flash (ni d'écriture de session)
+    is_xhr = is_ajax_request(request)
     try:
-        user = CustomUser.objects.get(id=user_id)
+        # Seuls les champs utilisés sont chargés (last_login sert à l'invalidation du cache)
+        user = CustomUser.objects.only('id', 'email', 'is_active', 'last_login').get(id=user_id)
         user.is_active = not user.is_active
-        user.save()
+        user.save(update_fields=['is_active'])
         
         status = 'activé' if user.is_active else 'désactivé'
-        messages.success(request, f'Utilisateur {user.email} {status} avec succès.')
-        
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-            return JsonResponse({
+        if is_xhr:
+            return ORJSONResponse({
                 'success': True,
                 'message': f'Utilisateur {status}',
                 'is_active': user.is_active
             })
+        messages.success(request, f'Utilisateur {user.email} {status} avec succès.')
     except CustomUser.DoesNotExist:
+        if is_xhr:
+            return ORJSONResponse({'success': False, 'message': 'Utilisateur introuvable'})
         messages.error(request, 'Utilisateur introuvable.')
-        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-            return JsonResponse({'success': False, 'message': 'Utilisateur introuvable'})
     
     return redirect('auth:user_list')
 
@@ -310,42 +432,40 @@ def toggle_user_status(request, user_id):
 @admin_required
 def change_user_type(request, user_id):
     """Vue pour changer le type d'utilisateur (admin uniquement)."""
+    # Les appels AJAX reçoivent du JSON : pas de message flash (ni d'écriture de session)
+    is_xhr = is_ajax_request(request)
     if request.method == 'POST':
         try:
-            user = CustomUser.objects.get(id=user_id)
+            user = CustomUser.objects.only('id', 'email', 'user_type', 'last_login').get(id=user_id)
             new_type = request.POST.get('user_type')
             
             if new_type in ['admin', 'client']:
                 old_type = user.user_type
-                user.user_type = new_type
-                user.save()
-                
-                # Mettre à jour les groupes
-                user.groups.clear()
-                if new_type == 'admin':
-                    from django.contrib.auth.models import Group
-                    admin_group, _ = Group.objects.get_or_create(name='admin')
-                    user.groups.add(admin_group)
-                elif new_type == 'client':
-                    from django.contrib.auth.models import Group
-                    client_group, _ = Group.objects.get_or_create(name='client')
-                    user.groups.add(client_group)
-                
-                messages.success(request, f'Type d\'utilisateur changé de {old_type} à {new_type} pour {user.email}.')
+                # Type et groupes mis à jour dans une seule transaction
+                with transaction.atomic():
+                    user.set_user_type(new_type)
+                    user.save(update_fields=['user_type'])
+                    
+                    # Remplacer les groupes ;
+                    # set() n'écrit que la différence avec les groupes actuels
+                    user.groups.set([get_role_group_id(new_type)])
                 
-                if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-                    return JsonResponse({
+                if is_xhr:
+                    return ORJSONResponse({
                         'success': True,
                         'message': f'Type changé à {new_type}',
                         'user_type': new_type
                     })
+                messages.success(request, f'Type d\'utilisateur changé de {old_type} à {new_type} pour {user.email}.')
+            elif is_xhr:
+                return ORJSONResponse({'success': False, 'message': 'Type d\'utilisateur invalide'})
             else:
                 messages.error(request, 'Type d\'utilisateur invalide.')
                 
         except CustomUser.DoesNotExist:
+            if is_xhr:
+                return ORJSONResponse({'success': False, 'message': 'Utilisateur introuvable'})
             messages.error(request, 'Utilisateur introuvable.')
-            if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
-                return JsonResponse({'success': False, 'message': 'Utilisateur introuvable'})
     
     return redirect('auth:user_list')
 
@@ -353,30 +473,114 @@ def change_user_type(request, user_id):
 @login_required
 def dashboard_redirect(request):
     """Redirige vers le dashboard approprié selon le type d'utilisateur."""
-    if request.user.is_admin:
-        return redirect('dashboard:admin')
-    else:
-        return redirect('dashboard:client')
+    return HttpResponseRedirect(_ADMIN_DASHBOARD_URL if request.user.is_admin else _CLIENT_DASHBOARD_URL)
+
+
+def _permission_names(user):
+    """
+    Permissions de l'utilisateur au format 'app.action_model', en une requête.
+    
+    Équivalent de get_all_permissions() pour ModelBackend, mais les
+    permissions directes et celles des groupes sont lues dans une seule
+    requête, limitée aux deux colonnes utiles (pas d'instance Permission).
+    """
+    permissions = Permission.objects.all()
+    if not user.is_superuser:
+        permissions = permissions.filter(Q(user=user) | Q(group__user=user))
+    return [
+        f'{app_label}.{codename}'
+        for app_label, codename in permissions.values_list('content_type__app_label', 'codename').distinct()
+    ]
 
 
 @require_http_methods(["GET"])
 @login_required
 def user_info_api(request):
-    """API pour obtenir les informations de l'utilisateur connecté."""
+    """
+    API pour obtenir les informations de l'utilisateur connecté.
+    
+    La réponse JSON déjà sérialisée et son ETag sont mis en cache (clé par
+    utilisateur et par connexion) ; les signaux de l'application l'invalident
+    lorsque l'utilisateur, ses groupes ou ses permissions changent.
+    L'ETag étant calculé sur le contenu, un client envoyant If-None-Match
+    reçoit un 304 sans corps tant que ses informations n'ont pas changé.
+    """
     user = request.user
-    data = {
-        'id': user.id,
-        'email': user.email,
-        'full_name': user.get_full_name(),
-        'user_type': user.user_type,
-        'is_admin': user.is_admin,
-        'is_client': user.is_client,
-        'groups': [group.name for group in user.groups.all()],
-        'permissions': list(user.get_all_permissions()),
-        'is_active': user.is_active,
-        'date_joined': user.date_joined.isoformat() if user.date_joined else None,
-    }
-    return JsonResponse(data)
+    key = user_info_cache_key(user.pk, user.last_login)
+    cached = cache.get(key)
+    if cached is None:
+        data = {
+            'id': user.id,
+            'email': user.email,
+            'full_name': user.get_full_name(),
+            'user_type': user.user_type,
+            'is_admin': user.is_admin,
+            'is_client': user.is_client,
+            'groups': user.get_group_name_list(),
+            'permissions': sorted(_permission_names(user)),
+            'is_active': user.is_active,
+            'date_joined': user.date_joined,  # Sérialisé en ISO 8601 par orjson
+        }
+        content = ORJSONResponse(data).content
+        cached = (content, f'"{hashlib.md5(content).hexdigest()}"')
+        cache.set(key, cached, USER_INFO_CACHE_TIMEOUT)
+    
+    content, etag = cached
+    # 304 Not Modified si le client possède déjà cette version
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(content, content_type='application/json')
+    response['ETag'] = etag
+    return response
+
+
+def _activate_paid_subscription(subscription, plan, start_date):
+    """
+    Prépare (sans l'enregistrer) l'activation d'un abonnement sur un plan payant.
+    
+    Args:
+        subscription (Subscription): Abonnement réactivé ou nouvel abonnement
+        plan (Plan): Plan payant cible
+        start_date (datetime): Début de la nouvelle période
+    """
+    subscription.status = 'active'
+    subscription.start_date = start_date
+    subscription.amount_paid = plan.price
+    subscription.payment_method = 'Migration administrative'
+    
+    # Calculer la date de fin selon le cycle de facturation
+    if plan.billing_cycle == 'monthly':
+        subscription.end_date = start_date + timedelta(days=30)
+        subscription.next_billing_date = subscription.end_date
+    elif plan.billing_cycle == 'yearly':
+        subscription.end_date = start_date + timedelta(days=365)
+        subscription.next_billing_date = subscription.end_date
+    elif plan.billing_cycle == 'lifetime':
+        subscription.end_date = None
+        subscription.next_billing_date = None
+
+
+def _paid_plans_data():
+    """
+    Sérialise les plans payants actifs, du moins cher au plus cher.
+    
+    Seules les colonnes sérialisées sont lues, sans instancier de modèles.
+    
+    Returns:
+        list: Plans (id, nom, prix, cycle de facturation, description)
+    """
+    billing_cycle_labels = dict(Plan.BILLING_CYCLE_CHOICES)
+    available_plans = Plan.objects.filter(
+        is_active=True,
+        plan_type__in=['basic', 'premium', 'enterprise']
+    ).order_by('price').values('id', 'name', 'price', 'billing_cycle', 'description')
+    return [{
+        'id': plan['id'],
+        'name': plan['name'],
+        'price': float(plan['price']),
+        'billing_cycle': billing_cycle_labels.get(plan['billing_cycle'], plan['billing_cycle']),
+        'description': plan['description']
+    } for plan in available_plans]
 
 
 @admin_required
@@ -390,25 +594,22 @@ def migrate_user_to_paid(request, user_id):
     - Annuler l'ancien abonnement gratuit s'il existe
     - Enregistrer l'historique de la migration
     """
-    from apps.subscription.models import Plan, Subscription, SubscriptionHistory
-    from django.utils import timezone
-    import json
-    
     try:
-        user = CustomUser.objects.get(id=user_id)
+        # Seuls l'identifiant, l'email et le nom sont utilisés par la vue
+        user = CustomUser.objects.only('id', 'email', 'first_name', 'last_name').get(id=user_id)
     except CustomUser.DoesNotExist:
-        return JsonResponse({
+        return ORJSONResponse({
             'success': False,
             'message': 'Utilisateur introuvable'
         })
     
     if request.method == 'POST':
         try:
-            data = json.loads(request.body)
+            data = orjson.loads(request.body)
             plan_id = data.get('plan_id')
             
             if not plan_id:
-                return JsonResponse({
+                return ORJSONResponse({
                     'success': False,
                     'message': 'Plan non spécifié'
                 })
@@ -417,108 +618,81 @@ def migrate_user_to_paid(request, user_id):
             try:
                 new_plan = Plan.objects.get(id=plan_id, is_active=True)
             except Plan.DoesNotExist:
-                return JsonResponse({
+                return ORJSONResponse({
                     'success': False,
                     'message': 'Plan introuvable ou inactif'
                 })
             
             # Vérifier que ce n'est pas un plan gratuit
             if new_plan.plan_type == 'free':
-                return JsonResponse({
+                return ORJSONResponse({
                     'success': False,
                     'message': 'Impossible de migrer vers un plan gratuit'
                 })
             
-            # Vérifier si l'utilisateur a déjà un abonnement actif
-            current_subscription = Subscription.objects.filter(
-                user=user,
-                status='active'
-            ).first()
-            
-            # Vérifier si l'utilisateur a déjà un abonnement avec le nouveau plan (même inactif)
-            existing_subscription_with_plan = Subscription.objects.filter(
-                user=user,
-                plan=new_plan
-            ).first()
-            
-            old_plan = None
-            if current_subscription:
-                old_plan = current_subscription.plan
-                # Annuler l'ancien abonnement
-                current_subscription.status = 'cancelled'
-                current_subscription.save()
-            
-            # Si l'utilisateur a déjà un abonnement avec ce plan, le réactiver
-            if existing_subscription_with_plan:
-                new_subscription = existing_subscription_with_plan
-                new_subscription.status = 'active'
-                new_subscription.start_date = timezone.now()
-                new_subscription.amount_paid = new_plan.price
-                new_subscription.payment_method = 'Migration administrative'
-            else:
-                # Créer un nouvel abonnement seulement s'il n'existe pas déjà
-                new_subscription = Subscription.objects.create(
-                    user=user,
-                    plan=new_plan,
-                    status='active',
-                    start_date=timezone.now(),
-                    amount_paid=new_plan.price,
-                    payment_method='Migration administrative'
+            # Abonnement actif et abonnement existant avec le nouveau plan
+            # (même inactif) lus en une seule requête, verrouillés jusqu'à la
+            # fin de la transaction pour éviter deux migrations concurrentes
+            # (of=('self',) : les plans joints ne sont pas verrouillés)
+            current_subscription = None
+            existing_subscription_with_plan = None
+            with transaction.atomic():
+                candidates = (
+                    Subscription.objects
+                    .select_for_update(of=('self',))
+                    .select_related('plan')
+                    .filter(Q(status='active') | Q(plan=new_plan), user=user)
+                )
+                for subscription in candidates:  # Tri par date décroissante (Meta.ordering)
+                    if current_subscription is None and subscription.status == 'active':
+                        current_subscription = subscription
+                    if existing_subscription_with_plan is None and subscription.plan_id == new_plan.id:
+                        existing_subscription_with_plan = subscription
+                
+                old_plan = None
+                if current_subscription:
+                    old_plan = current_subscription.plan
+                    # Annuler l'ancien abonnement (sauf s'il est réactivé ci-dessous)
+                    if current_subscription is not existing_subscription_with_plan:
+                        current_subscription.status = 'cancelled'
+                        current_subscription.save(update_fields=['status', 'updated_at'])
+                
+                # Si l'utilisateur a déjà un abonnement avec ce plan, le réactiver ;
+                # sinon en préparer un nouveau (enregistré une seule fois)
+                new_subscription = existing_subscription_with_plan or Subscription(user=user, plan=new_plan)
+                _activate_paid_subscription(new_subscription, new_plan, timezone.now())
+                new_subscription.save()
+                
+                # Enregistrer l'historique
+                SubscriptionHistory.objects.create(
+                    subscription=new_subscription,
+                    action='upgraded' if old_plan and old_plan.price < new_plan.price else 'created',
+                    old_plan=old_plan,
+                    new_plan=new_plan,
+                    notes=f'Migration administrative par {request.user.email}'
                 )
             
-            # Calculer la date de fin selon le cycle de facturation
-            if new_plan.billing_cycle == 'monthly':
-                new_subscription.end_date = new_subscription.start_date + timezone.timedelta(days=30)
-                new_subscription.next_billing_date = new_subscription.end_date
-            elif new_plan.billing_cycle == 'yearly':
-                new_subscription.end_date = new_subscription.start_date + timezone.timedelta(days=365)
-                new_subscription.next_billing_date = new_subscription.end_date
-            elif new_plan.billing_cycle == 'lifetime':
-                new_subscription.end_date = None
-                new_subscription.next_billing_date = None
-            
-            new_subscription.save()
-            
-            # Enregistrer l'historique
-            SubscriptionHistory.objects.create(
-                subscription=new_subscription,
-                action='upgraded' if old_plan and old_plan.price < new_plan.price else 'created',
-                old_plan=old_plan,
-                new_plan=new_plan,
-                notes=f'Migration administrative par {request.user.email}'
-            )
-            
-            return JsonResponse({
+            return ORJSONResponse({
                 'success': True,
                 'message': f'Utilisateur migré vers le plan {new_plan.name} avec succès'
             })
             
-        except json.JSONDecodeError:
-            return JsonResponse({
+        except orjson.JSONDecodeError:
+            return ORJSONResponse({
                 'success': False,
                 'message': 'Données JSON invalides'
             })
         except Exception as e:
-            return JsonResponse({
+            return ORJSONResponse({
                 'success': False,
                 'message': f'Erreur lors de la migration: {str(e)}'
             })
     
-    # GET request - Retourner les plans disponibles
-    available_plans = Plan.objects.filter(
-        is_active=True,
-        plan_type__in=['basic', 'premium', 'enterprise']
-    ).order_by('price')
-    
-    plans_data = [{
-        'id': plan.id,
-        'name': plan.name,
-        'price': float(plan.price),
-        'billing_cycle': plan.get_billing_cycle_display(),
-        'description': plan.description
-    } for plan in available_plans]
+    # GET request - Retourner les plans disponibles (catalogue en cache,
+    # invalidé à chaque modification d'un plan)
+    plans_data = cache.get_or_set(PAID_PLANS_CACHE_KEY, _paid_plans_data, PAID_PLANS_CACHE_TIMEOUT)
     
-    return JsonResponse({
+    return ORJSONResponse({
         'success': True,
         'user': {
             'id': user.id,
@@ -539,35 +713,32 @@ def migrate_user_to_free(request, user_id):
     - Créer un nouvel abonnement gratuit
     - Enregistrer l'historique de la rétrogradation
     """
-    from apps.subscription.models import Plan, Subscription, SubscriptionHistory
-    from django.utils import timezone
-    import json
-    
     try:
-        user = CustomUser.objects.get(id=user_id)
+        # Seuls l'identifiant, l'email et le nom sont utilisés par la vue
+        user = CustomUser.objects.only('id', 'email', 'first_name', 'last_name').get(id=user_id)
     except CustomUser.DoesNotExist:
-        return JsonResponse({
+        return ORJSONResponse({
             'success': False,
             'message': 'Utilisateur introuvable'
         })
     
     if request.method == 'POST':
         try:
-            # Vérifier si l'utilisateur a un abonnement payant actif
-            current_subscription = Subscription.objects.filter(
+            # Vérifier si l'utilisateur a un abonnement payant actif (plan joint)
+            current_subscription = Subscription.objects.select_related('plan').filter(
                 user=user,
                 status='active'
             ).first()
             
             if not current_subscription:
-                return JsonResponse({
+                return ORJSONResponse({
                     'success': False,
                     'message': 'Aucun abonnement actif trouvé pour cet utilisateur'
                 })
             
             # Vérifier que l'abonnement actuel n'est pas déjà gratuit
             if current_subscription.plan.plan_type == 'free':
-                return JsonResponse({
+                return ORJSONResponse({
                     'success': False,
                     'message': 'L\'utilisateur a déjà un abonnement gratuit'
                 })
@@ -576,60 +747,60 @@ def migrate_user_to_free(request, user_id):
             try:
                 free_plan = Plan.objects.get(plan_type='free', is_active=True)
             except Plan.DoesNotExist:
-                return JsonResponse({
+                return ORJSONResponse({
                     'success': False,
                     'message': 'Plan gratuit introuvable'
                 })
             
-            old_plan = current_subscription.plan
-            
             # Modifier l'abonnement existant au lieu de créer un nouveau (évite la contrainte unique)
             old_plan = current_subscription.plan
             
-            # Passer au plan gratuit en modifiant l'abonnement existant
-            current_subscription.plan = free_plan
-            current_subscription.amount_paid = 0.00
-            current_subscription.payment_method = 'Rétrogradation administrative'
-            current_subscription.start_date = timezone.now()
-            current_subscription.end_date = None
-            current_subscription.next_billing_date = None
-            current_subscription.save()
-            
-            new_subscription = current_subscription
-            
-            # Enregistrer l'historique
-            SubscriptionHistory.objects.create(
-                subscription=new_subscription,
-                action='downgraded',
-                old_plan=old_plan,
-                new_plan=free_plan,
-                notes=f'Rétrogradation administrative par {request.user.email}'
-            )
+            # Abonnement et historique enregistrés dans une seule transaction
+            with transaction.atomic():
+                # Passer au plan gratuit en modifiant l'abonnement existant
+                current_subscription.plan = free_plan
+                current_subscription.amount_paid = 0.00
+                current_subscription.payment_method = 'Rétrogradation administrative'
+                current_subscription.start_date = timezone.now()
+                current_subscription.end_date = None
+                current_subscription.next_billing_date = None
+                current_subscription.save()
+                
+                new_subscription = current_subscription
+                
+                # Enregistrer l'historique
+                SubscriptionHistory.objects.create(
+                    subscription=new_subscription,
+                    action='downgraded',
+                    old_plan=old_plan,
+                    new_plan=free_plan,
+                    notes=f'Rétrogradation administrative par {request.user.email}'
+                )
             
-            return JsonResponse({
+            return ORJSONResponse({
                 'success': True,
                 'message': f'Utilisateur rétrogradé vers le plan gratuit avec succès'
             })
             
         except Exception as e:
-            return JsonResponse({
+            return ORJSONResponse({
                 'success': False,
                 'message': f'Erreur lors de la rétrogradation: {str(e)}'
             })
     
     # GET request - Retourner les informations de l'utilisateur et son abonnement actuel
-    current_subscription = Subscription.objects.filter(
+    current_subscription = Subscription.objects.select_related('plan').filter(
         user=user,
         status='active'
     ).first()
     
     if not current_subscription or current_subscription.plan.plan_type == 'free':
-        return JsonResponse({
+        return ORJSONResponse({
             'success': False,
             'message': 'L\'utilisateur n\'a pas d\'abonnement payant actif'
         })
     
-    return JsonResponse({
+    return ORJSONResponse({
         'success': True,
         'user': {
             'id': user.id,
@@ -651,25 +822,37 @@ def password_reset_request(request):
     Vue pour demander une réinitialisation de mot de passe.
     Envoie un email avec un lien de réinitialisation.
     """
-    from .forms import PasswordResetRequestForm
-    from .models import PasswordResetToken
-    from django.core.mail import send_mail
-    from django.conf import settings
-    from django.urls import reverse
-    
     if request.method == 'POST':
         form = PasswordResetRequestForm(request.POST)
         if form.is_valid():
             email = form.cleaned_data['email']
+            
+            # Au-delà de la limite, même réponse que pour une adresse inconnue,
+            # sans requête SQL, création de token ni envoi d'email
+            # (add + incr : compteur atomique sous Redis)
+            rate_key = f'pwreset:{email.lower()}'
+            cache.add(rate_key, 0, PASSWORD_RESET_WINDOW)
+            try:
+                attempts = cache.incr(rate_key)
+            except ValueError:  # Clé expirée entre add() et incr()
+                cache.set(rate_key, 1, PASSWORD_RESET_WINDOW)
+                attempts = 1
+            if attempts > PASSWORD_RESET_MAX_REQUESTS:
+                messages.success(
+                    request,
+                    'Si cette adresse email existe, un email de réinitialisation a été envoyé.'
+                )
+                return redirect('auth:login')
+            
             try:
                 user = CustomUser.objects.get(email=email)
                 
-                # Créer un token de réinitialisation
-                reset_token = PasswordResetToken.create_token(user)
+                # Créer un token de réinitialisation (seule son empreinte est stockée)
+                reset_token, raw_token = PasswordResetToken.create_token(user)
                 
                 # Construire l'URL de réinitialisation
                 reset_url = request.build_absolute_uri(
-                    reverse('auth:password_reset_confirm', kwargs={'token': reset_token.token})
+                    reverse('auth:password_reset_confirm', kwargs={'token': raw_token})
                 )
                 
                 # Envoyer l'email
@@ -690,13 +873,8 @@ Cordialement,
 L'équipe de support
 """
                 
-                send_mail(
-                    subject,
-                    message,
-                    settings.DEFAULT_FROM_EMAIL,
-                    [email],
-                    fail_silently=False,
-                )
+                # Envoyer l'email hors de la requête (échecs SMTP journalisés)
+                send_mail_in_background(subject, message, email)
                 
                 messages.success(
                     request,
@@ -711,7 +889,8 @@ L'équipe de support
                     'Si cette adresse email existe, un email de réinitialisation a été envoyé.'
                 )
                 return redirect('auth:login')
-            except Exception as e:
+            except Exception:
+                logger.exception("Échec de la demande de réinitialisation de mot de passe pour %s", email)
                 messages.error(
                     request,
                     'Une erreur est survenue lors de l\'envoi de l\'email. Veuillez réessayer.'
@@ -726,11 +905,8 @@ def password_reset_confirm(request, token):
     """
     Vue pour confirmer la réinitialisation de mot de passe avec un token.
     """
-    from .forms import PasswordResetConfirmForm
-    from .models import PasswordResetToken
-    
     try:
-        reset_token = PasswordResetToken.objects.get(token=token)
+        reset_token = PasswordResetToken.get_by_token(token)
         
         if not reset_token.is_valid():
             messages.error(
@@ -0,0 +1,41 @@
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from apps.auth.models import CustomUser
+from apps.subscription.models import Plan, Subscription
+
+# Agrégats du dashboard administrateur mis en cache (quelques secondes de
+# retard sont acceptables, les données changent au rythme des inscriptions)
+DASHBOARD_CACHE_TIMEOUT = 60
+ADMIN_CONTEXT_CACHE_KEY = 'dash:admin:v1'
+ADMIN_DETAILED_STATS_CACHE_KEY = 'dash:admin:detailed:v1'
+ADMIN_CHARTS_CACHE_KEY = 'dash:admin:charts:v1'
+ADMIN_QUICK_STATS_CACHE_KEY = 'dash:quick:admin:v1'
+
+DASHBOARD_CACHE_KEYS = [
+    ADMIN_CONTEXT_CACHE_KEY,
+    ADMIN_DETAILED_STATS_CACHE_KEY,
+    ADMIN_CHARTS_CACHE_KEY,
+    ADMIN_QUICK_STATS_CACHE_KEY,
+]
+
+
+def invalidate_admin_stats_cache():
+    """
+    Supprime les agrégats du dashboard administrateur mis en cache.
+    
+    Appelée aussi par les actions d'administration qui modifient les
+    abonnements ou les plans avec queryset.update(), sans signal post_save.
+    """
+    cache.delete_many(DASHBOARD_CACHE_KEYS)
+
+
+@receiver([post_save, post_delete], sender=CustomUser, dispatch_uid='dashboard.invalidate_admin_stats_users')
+@receiver([post_save, post_delete], sender=Subscription, dispatch_uid='dashboard.invalidate_admin_stats_subscriptions')
+@receiver([post_save, post_delete], sender=Plan, dispatch_uid='dashboard.invalidate_admin_stats_plans')
+def invalidate_admin_stats(sender, update_fields=None, **kwargs):
+    """Invalide les agrégats du dashboard administrateur."""
+    # La mise à jour de last_login à chaque connexion ne change aucune statistique
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    invalidate_admin_stats_cache()
@@ -4,12 +4,19 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.views.generic import TemplateView
 from django.contrib import messages
 from django.http import JsonResponse
+from django.core.cache import cache
+from django.utils.functional import cached_property
 from django.db.models import Count, Sum, Q
+from django.db.models.functions import TruncDate
 from django.utils import timezone
 from datetime import timedelta
 from apps.auth.models import CustomUser
 from apps.subscription.models import Plan, Subscription
 from apps.auth.permissions import AdminRequiredMixin, ClientRequiredMixin, get_user_role_context
+from .signals import (
+    DASHBOARD_CACHE_TIMEOUT, ADMIN_CONTEXT_CACHE_KEY, ADMIN_DETAILED_STATS_CACHE_KEY,
+    ADMIN_CHARTS_CACHE_KEY, ADMIN_QUICK_STATS_CACHE_KEY,
+)
 
 
 class DashboardView(LoginRequiredMixin, TemplateView):
@@ -21,7 +28,7 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         user = self.request.user
         
         # Ajouter le contexte des rôles
-        context.update(get_user_role_context(user))
+        context.update(get_user_role_context(user, self.request))
         
         # Données spécifiques selon le rôle
         if user.is_admin:
@@ -32,38 +39,46 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         return context
     
     def get_admin_context(self):
-        """Contexte spécifique pour les administrateurs."""
-        # Statistiques générales
-        total_users = CustomUser.objects.count()
-        total_subscriptions = Subscription.objects.filter(status='active').count()
-        total_revenue = Subscription.objects.filter(
-            status='active'
-        ).aggregate(Sum('amount_paid'))['amount_paid__sum'] or 0
+        """Contexte spécifique pour les administrateurs (en cache 60 secondes)."""
+        return cache.get_or_set(ADMIN_CONTEXT_CACHE_KEY, self._compute_admin_context, DASHBOARD_CACHE_TIMEOUT)
+    
+    def _compute_admin_context(self):
+        """Calcule le contexte administrateur (requêtes évaluées pour la mise en cache)."""
+        week_ago = timezone.now() - timedelta(days=7)
+        
+        # Statistiques générales : une requête d'agrégats par table
+        users = CustomUser.objects.aggregate(
+            total=Count('id'),
+            new_week=Count('id', filter=Q(date_joined__gte=week_ago)),  # Nouveaux cette semaine
+        )
+        subscriptions = Subscription.objects.aggregate(
+            active=Count('id', filter=Q(status='active')),
+            revenue=Sum('amount_paid', filter=Q(status='active')),
+        )
         
         # Statistiques par plan
-        plan_stats = Plan.objects.annotate(
+        plan_stats = Plan.objects.only('name').annotate(
             subscription_count=Count('subscriptions', filter=Q(subscriptions__status='active'))
         ).order_by('-subscription_count')
         
-        # Nouveaux utilisateurs cette semaine
-        week_ago = timezone.now() - timedelta(days=7)
-        new_users_week = CustomUser.objects.filter(date_joined__gte=week_ago).count()
-        
-        # Abonnements récents
+        # Abonnements récents (colonnes affichées par le template uniquement)
         recent_subscriptions = Subscription.objects.select_related(
             'user', 'plan'
+        ).only(
+            'created_at', 'amount_paid',
+            'user__first_name', 'user__last_name', 'user__email', 'plan__name'
         ).filter(
             status='active'
         ).order_by('-created_at')[:5]
         
         return {
             'dashboard_type': 'admin',
-            'total_users': total_users,
-            'total_subscriptions': total_subscriptions,
-            'total_revenue': total_revenue,
-            'new_users_week': new_users_week,
-            'plan_stats': plan_stats,
-            'recent_subscriptions': recent_subscriptions,
+            'total_users': users['total'],
+            'total_subscriptions': subscriptions['active'],
+            'total_revenue': subscriptions['revenue'] or 0,
+            'new_users_week': users['new_week'],
+            'plan_stats': list(plan_stats),
+            'recent_subscriptions': list(recent_subscriptions),
         }
     
     def get_client_context(self):
@@ -71,7 +86,7 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         user = self.request.user
         
         # Abonnement actuel
-        current_subscription = Subscription.objects.filter(
+        current_subscription = Subscription.objects.select_related('plan').filter(
             user=user,
             status='active'
         ).first()
@@ -81,10 +96,10 @@ class DashboardView(LoginRequiredMixin, TemplateView):
             user=user
         ).select_related('plan').order_by('-created_at')[:5]
         
-        # Plans disponibles pour mise à niveau
-        available_plans = Plan.objects.filter(is_active=True)
+        # Plans disponibles pour mise à niveau (colonnes affichées uniquement)
+        available_plans = Plan.objects.filter(is_active=True).only('name', 'description', 'price')
         if current_subscription:
-            available_plans = available_plans.exclude(id=current_subscription.plan.id)
+            available_plans = available_plans.exclude(id=current_subscription.plan_id)
         
         return {
             'dashboard_type': 'client',
@@ -107,71 +122,107 @@ class AdminDashboardView(AdminRequiredMixin, LoginRequiredMixin, TemplateView):
         
         return context
     
+    @cached_property
+    def plans_with_active_counts(self):
+        """
+        Plans annotés de leur nombre d'abonnements actifs (une requête par vue).
+        
+        Partagé par les statistiques détaillées et les graphiques lorsque
+        leurs caches expirent ensemble.
+        
+        Returns:
+            list: Plans (ordre par défaut) avec l'attribut active_count
+        """
+        return list(Plan.objects.annotate(
+            active_count=Count('subscriptions', filter=Q(subscriptions__status='active'))
+        ))
+    
     def get_detailed_stats(self):
-        """Statistiques détaillées pour les admins."""
-        from django.db.models import Q
+        """Statistiques détaillées pour les admins (en cache 60 secondes)."""
+        return cache.get_or_set(
+            ADMIN_DETAILED_STATS_CACHE_KEY, self._compute_detailed_stats, DASHBOARD_CACHE_TIMEOUT
+        )
+    
+    def _compute_detailed_stats(self):
+        """
+        Calcule les statistiques détaillées.
         
+        Chaque table est comptée en une seule requête (agrégats
+        conditionnels) au lieu d'un COUNT par statistique.
+        """
         now = timezone.now()
         month_ago = now - timedelta(days=30)
         
+        users = CustomUser.objects.aggregate(
+            total=Count('id'),
+            admins=Count('id', filter=Q(user_type='admin')),
+            clients=Count('id', filter=Q(user_type='client')),
+            active=Count('id', filter=Q(is_active=True)),
+            new_this_month=Count('id', filter=Q(date_joined__gte=month_ago)),
+        )
+        subscriptions = Subscription.objects.aggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(status='active')),
+            cancelled=Count('id', filter=Q(status='cancelled')),
+            expired=Count('id', filter=Q(status='expired')),
+            new_this_month=Count('id', filter=Q(created_at__gte=month_ago)),
+            revenue_total=Sum('amount_paid', filter=Q(status='active')),
+            revenue_this_month=Sum('amount_paid', filter=Q(status='active', created_at__gte=month_ago)),
+        )
+        plans = self.plans_with_active_counts
+        
         return {
-            'users': {
-                'total': CustomUser.objects.count(),
-                'admins': CustomUser.objects.filter(user_type='admin').count(),
-                'clients': CustomUser.objects.filter(user_type='client').count(),
-                'active': CustomUser.objects.filter(is_active=True).count(),
-                'new_this_month': CustomUser.objects.filter(date_joined__gte=month_ago).count(),
-            },
+            'users': users,
             'subscriptions': {
-                'total': Subscription.objects.count(),
-                'active': Subscription.objects.filter(status='active').count(),
-                'cancelled': Subscription.objects.filter(status='cancelled').count(),
-                'expired': Subscription.objects.filter(status='expired').count(),
-                'new_this_month': Subscription.objects.filter(created_at__gte=month_ago).count(),
+                'total': subscriptions['total'],
+                'active': subscriptions['active'],
+                'cancelled': subscriptions['cancelled'],
+                'expired': subscriptions['expired'],
+                'new_this_month': subscriptions['new_this_month'],
             },
             'revenue': {
-                'total': Subscription.objects.filter(
-                    status='active'
-                ).aggregate(Sum('amount_paid'))['amount_paid__sum'] or 0,
-                'this_month': Subscription.objects.filter(
-                    created_at__gte=month_ago,
-                    status='active'
-                ).aggregate(Sum('amount_paid'))['amount_paid__sum'] or 0,
+                'total': subscriptions['revenue_total'] or 0,
+                'this_month': subscriptions['revenue_this_month'] or 0,
             },
             'plans': {
-                'total': Plan.objects.count(),
-                'active': Plan.objects.filter(is_active=True).count(),
-                'most_popular': Plan.objects.annotate(
-                    sub_count=Count('subscriptions', filter=Q(subscriptions__status='active'))
-                ).order_by('-sub_count').first(),
+                'total': len(plans),
+                'active': sum(1 for plan in plans if plan.is_active),
+                'most_popular': max(plans, key=lambda plan: plan.active_count, default=None),
             }
         }
     
     def get_charts_data(self):
-        """Données pour les graphiques."""
-        # Données pour le graphique des inscriptions par jour (7 derniers jours)
-        days_data = []
-        for i in range(7):
-            date = timezone.now().date() - timedelta(days=i)
-            count = CustomUser.objects.filter(date_joined__date=date).count()
-            days_data.append({
-                'date': date.strftime('%d/%m'),
-                'count': count
-            })
+        """Données pour les graphiques (en cache 60 secondes)."""
+        return cache.get_or_set(ADMIN_CHARTS_CACHE_KEY, self._compute_charts_data, DASHBOARD_CACHE_TIMEOUT)
+    
+    def _compute_charts_data(self):
+        """Calcule les données des graphiques."""
+        # Données pour le graphique des inscriptions par jour (7 derniers jours) :
+        # un seul GROUP BY, les jours sans inscription sont complétés à 0
+        today = timezone.now().date()
+        days = [today - timedelta(days=i) for i in range(6, -1, -1)]
+        counts_by_day = dict(
+            CustomUser.objects
+            .filter(date_joined__date__gte=days[0], date_joined__date__lte=today)
+            .annotate(day=TruncDate('date_joined'))
+            .values('day')
+            .annotate(count=Count('id'))
+            .values_list('day', 'count')
+        )
+        days_data = [{
+            'date': day.strftime('%d/%m'),
+            'count': counts_by_day.get(day, 0)
+        } for day in days]
         
-        # Répartition des abonnements par plan
-        plan_data = []
-        for plan in Plan.objects.all():
-            count = plan.subscriptions.filter(status='active').count()
-            if count > 0:
-                plan_data.append({
-                    'name': plan.name,
-                    'count': count,
-                    'revenue': float(count * plan.price)
-                })
+        # Répartition des abonnements par plan (plans annotés partagés)
+        plan_data = [{
+            'name': plan.name,
+            'count': plan.active_count,
+            'revenue': float(plan.active_count * plan.price)
+        } for plan in self.plans_with_active_counts if plan.active_count > 0]
         
         return {
-            'registrations': list(reversed(days_data)),
+            'registrations': days_data,
             'plans': plan_data,
         }
 
@@ -185,7 +236,7 @@ class ClientDashboardView(ClientRequiredMixin, LoginRequiredMixin, TemplateView)
         user = self.request.user
         
         # Informations sur l'abonnement
-        current_subscription = Subscription.objects.filter(
+        current_subscription = Subscription.objects.select_related('plan').filter(
             user=user,
             status='active'
         ).first()
@@ -270,26 +321,35 @@ def dashboard_redirect(request):
         return redirect('dashboard:client')
 
 
+def _admin_quick_stats():
+    """Calcule les statistiques rapides des administrateurs."""
+    return {
+        'total_users': CustomUser.objects.count(),
+        'active_subscriptions': Subscription.objects.filter(status='active').count(),
+        'total_revenue': float(
+            Subscription.objects.filter(
+                status='active'
+            ).aggregate(Sum('amount_paid'))['amount_paid__sum'] or 0
+        ),
+        'new_users_today': CustomUser.objects.filter(
+            date_joined__date=timezone.now().date()
+        ).count(),
+    }
+
+
 @login_required
 def quick_stats_api(request):
     """API pour les statistiques rapides (utilisée par AJAX)."""
     user = request.user
     
     if user.is_admin:
-        data = {
-            'total_users': CustomUser.objects.count(),
-            'active_subscriptions': Subscription.objects.filter(status='active').count(),
-            'total_revenue': float(
-                Subscription.objects.filter(
-                    status='active'
-                ).aggregate(Sum('amount_paid'))['amount_paid__sum'] or 0
-            ),
-            'new_users_today': CustomUser.objects.filter(
-                date_joined__date=timezone.now().date()
-            ).count(),
-        }
+        # Statistiques globales, identiques pour tous les admins : en cache
+        data = cache.get_or_set(ADMIN_QUICK_STATS_CACHE_KEY, _admin_quick_stats, DASHBOARD_CACHE_TIMEOUT)
     else:
-        subscription = Subscription.objects.filter(
+        # Une seule requête, limitée aux colonnes utilisées par la réponse
+        subscription = Subscription.objects.select_related('plan').only(
+            'status', 'end_date', 'plan__name'
+        ).filter(
             user=user,
             status='active'
         ).first()
@@ -311,8 +371,10 @@ def user_activity_feed(request):
     activities = []
     
     if user.is_admin:
-        # Activités récentes pour les admins
-        recent_users = CustomUser.objects.order_by('-date_joined')[:5]
+        # Activités récentes pour les admins (colonnes affichées uniquement)
+        recent_users = CustomUser.objects.only(
+            'first_name', 'last_name', 'email', 'date_joined'
+        ).order_by('-date_joined')[:5]
         for u in recent_users:
             activities.append({
                 'type': 'user_registered',
@@ -323,6 +385,8 @@ def user_activity_feed(request):
         
         recent_subscriptions = Subscription.objects.select_related(
             'user', 'plan'
+        ).only(
+            'created_at', 'user__first_name', 'user__last_name', 'user__email', 'plan__name'
         ).order_by('-created_at')[:5]
         for sub in recent_subscriptions:
             activities.append({
@@ -1,7 +1,10 @@
 from django.contrib import admin
+from django.db.models import Count, Q
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
+from apps.auth.signals import invalidate_plan_cache
+from apps.dashboard.signals import invalidate_admin_stats_cache
 from .models import Plan, Subscription, SubscriptionHistory
 
 
@@ -64,8 +67,8 @@ class PlanAdmin(admin.ModelAdmin):
     price_display.short_description = 'Prix'
     
     def subscription_count(self, obj):
-        """Affiche le nombre d'abonnements actifs pour ce plan."""
-        count = obj.subscriptions.filter(status='active').count()
+        """Affiche le nombre d'abonnements actifs pour ce plan (annoté par get_queryset)."""
+        count = obj.active_sub_count
         if count > 0:
             url = reverse('admin:subscription_subscription_changelist')
             return format_html(
@@ -74,10 +77,19 @@ class PlanAdmin(admin.ModelAdmin):
             )
         return '0 abonnement'
     subscription_count.short_description = 'Abonnements actifs'
+    subscription_count.admin_order_field = 'active_sub_count'
+    
+    def get_queryset(self, request):
+        """Compte les abonnements actifs de chaque plan dans la requête de liste."""
+        return super().get_queryset(request).annotate(
+            active_sub_count=Count('subscriptions', filter=Q(subscriptions__status='active'))
+        )
     
     def make_active(self, request, queryset):
         """Active les plans sélectionnés."""
         updated = queryset.update(is_active=True)
+        invalidate_plan_cache()
+        invalidate_admin_stats_cache()
         self.message_user(
             request,
             f'{updated} plan(s) activé(s) avec succès.'
@@ -87,6 +99,8 @@ class PlanAdmin(admin.ModelAdmin):
     def make_inactive(self, request, queryset):
         """Désactive les plans sélectionnés."""
         updated = queryset.update(is_active=False)
+        invalidate_plan_cache()
+        invalidate_admin_stats_cache()
         self.message_user(
             request,
             f'{updated} plan(s) désactivé(s) avec succès.'
@@ -112,6 +126,10 @@ class SubscriptionHistoryInline(admin.TabularInline):
     
     def has_add_permission(self, request, obj=None):
         return False
+    
+    def get_queryset(self, request):
+        """Charge les plans affichés avec chaque ligne (pas de requête par ligne)."""
+        return super().get_queryset(request).select_related('old_plan', 'new_plan')
 
 
 @admin.register(Subscription)
@@ -204,12 +222,9 @@ class SubscriptionAdmin(admin.ModelAdmin):
     days_remaining_display.short_description = 'Jours restants'
     
     def cancel_subscriptions(self, request, queryset):
-        """Annule les abonnements sélectionnés."""
-        updated = 0
-        for subscription in queryset:
-            if subscription.status == 'active':
-                subscription.cancel()
-                updated += 1
+        """Annule les abonnements sélectionnés (une seule requête UPDATE)."""
+        updated = queryset.cancel_active()
+        invalidate_admin_stats_cache()
         
         self.message_user(
             request,
@@ -220,6 +235,7 @@ class SubscriptionAdmin(admin.ModelAdmin):
     def activate_subscriptions(self, request, queryset):
         """Active les abonnements sélectionnés."""
         updated = queryset.update(status='active')
+        invalidate_admin_stats_cache()
         self.message_user(
             request,
             f'{updated} abonnement(s) activé(s) avec succès.'
@@ -227,12 +243,9 @@ class SubscriptionAdmin(admin.ModelAdmin):
     activate_subscriptions.short_description = "Activer les abonnements sélectionnés"
     
     def renew_subscriptions(self, request, queryset):
-        """Renouvelle les abonnements sélectionnés."""
-        updated = 0
-        for subscription in queryset:
-            if subscription.status in ['cancelled', 'expired']:
-                subscription.renew()
-                updated += 1
+        """Renouvelle les abonnements sélectionnés (une requête par cycle de facturation)."""
+        updated = queryset.renew_inactive()
+        invalidate_admin_stats_cache()
         
         self.message_user(
             request,
@@ -0,0 +1,17 @@
+# Generated manually
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscription', '0002_usertemporarypermission_planpermission_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['status', 'plan'], name='sub_status_plan_idx'),
+        ),
+    ]
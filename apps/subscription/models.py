@@ -190,6 +190,53 @@ class Plan(models.Model):
         return features
 
 
+class SubscriptionQuerySet(models.QuerySet):
+    """
+    Opérations groupées sur les abonnements (actions d'administration).
+    
+    Équivalents de Subscription.cancel() et Subscription.renew() pour un
+    ensemble d'abonnements : quelques UPDATE au lieu d'une sauvegarde par
+    ligne. Comme update(), ces méthodes n'émettent pas de signal post_save.
+    """
+    
+    def cancel_active(self):
+        """
+        Annule les abonnements actifs de l'ensemble.
+        
+        Returns:
+            int: Nombre d'abonnements annulés
+        """
+        return self.filter(status='active').update(status='cancelled', updated_at=timezone.now())
+    
+    def renew_inactive(self):
+        """
+        Renouvelle les abonnements annulés ou expirés de l'ensemble.
+        
+        Une requête par cycle de facturation : la nouvelle date de fin
+        dépend du cycle du plan (inchangée pour les plans à vie).
+        
+        Returns:
+            int: Nombre d'abonnements renouvelés
+        """
+        now = timezone.now()
+        renewable = self.filter(status__in=['cancelled', 'expired'])
+        periods = {
+            'monthly': timedelta(days=30),
+            'yearly': timedelta(days=365),
+        }
+        
+        updated = 0
+        for billing_cycle, period in periods.items():
+            end_date = now + period
+            updated += renewable.filter(plan__billing_cycle=billing_cycle).update(
+                status='active', end_date=end_date, next_billing_date=end_date, updated_at=now
+            )
+        updated += renewable.exclude(plan__billing_cycle__in=periods).update(
+            status='active', next_billing_date=models.F('end_date'), updated_at=now
+        )
+        return updated
+
+
 class Subscription(models.Model):
     """
     Modèle représentant l'abonnement d'un utilisateur à un plan.
@@ -283,12 +330,19 @@ class Subscription(models.Model):
     created_at = models.DateTimeField('Créé le', auto_now_add=True)
     updated_at = models.DateTimeField('Modifié le', auto_now=True)
     
+    # Manager avec les opérations groupées (cancel_active, renew_inactive)
+    objects = SubscriptionQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Abonnement'
         verbose_name_plural = 'Abonnements'
         ordering = ['-created_at']  # Tri par date de création décroissante
         # Un utilisateur ne peut avoir qu'un seul abonnement actif par plan
         unique_together = ['user', 'plan', 'status']
+        indexes = [
+            # Statistiques du dashboard : comptages par statut et par plan
+            models.Index(fields=['status', 'plan'], name='sub_status_plan_idx'),
+        ]
     
     # === MÉTHODES D'AFFICHAGE ===
     def __str__(self):
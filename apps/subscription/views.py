@@ -20,8 +20,8 @@ from django.utils import timezone
 from .models import Plan, Subscription, SubscriptionHistory
 # Modèles pour les permissions temporaires
 from .models_permissions import UserTemporaryPermission
-# Permissions personnalisées pour les administrateurs
-from apps.auth.permissions import admin_required, AdminRequiredMixin
+# Permissions personnalisées pour les administrateurs et détection AJAX
+from apps.auth.permissions import admin_required, AdminRequiredMixin, is_ajax_request
 
 
 class PlanListView(ListView):
@@ -669,7 +669,7 @@ def toggle_plan_status(request, plan_id):
     messages.success(request, f'Plan {plan.name} {status} avec succès.')
     
     # Réponse différente selon le type de requête
-    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+    if is_ajax_request(request):
         # Requête AJAX : retourner JSON
         return JsonResponse({
             'success': True,
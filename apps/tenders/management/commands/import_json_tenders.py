@@ -148,9 +148,7 @@ class Command(BaseCommand):
             return 'imported'
         
         # Vérifier si l'appel d'offres existe déjà
-        existing_tender = Tender.objects.filter(content_hash=content_hash).first()
-        
-        if existing_tender:
+        if Tender.objects.filter(content_hash=content_hash).exists():
             return 'skipped'
         
         # Traiter la date limite
@@ -66,6 +66,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'config.wsgi.application'
+ASGI_APPLICATION = 'config.asgi.application'
 
 # Database
 DATABASES = {
@@ -78,6 +79,24 @@ DATABASES = {
 # Custom User Model
 AUTH_USER_MODEL = 'custom_auth.CustomUser'
 
+# Authentication backends
+# Un seul backend : un échec de connexion ne hache le mot de passe qu'une fois.
+# Les sessions ouvertes avec ModelBackend avant son ajout sont déconnectées une fois.
+AUTHENTICATION_BACKENDS = [
+    'apps.auth.backends.CustomUserBackend',
+]
+
+# Password hashers
+# Le premier hacheur est utilisé pour les nouveaux mots de passe ; les suivants
+# permettent de vérifier (puis convertir) les hashs existants
+PASSWORD_HASHERS = [
+    'apps.auth.hashers.TunedArgon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {